@@ -1,6 +1,6 @@
 import os, json
 from typing import Tuple, Any
-from openai import OpenAI
+from openai_client import get_client
 from jsonschema import Draft202012Validator
 from dotenv import load_dotenv
 load_dotenv()
@@ -47,7 +47,6 @@ MOVIE_SCHEMA = {
 }
 
 VALIDATOR = Draft202012Validator(MOVIE_SCHEMA)
-client = OpenAI()
 
 PROMPTS = [
     'Return a movie JSON for "Titanic" with rating and a couple of main characters.',
@@ -68,7 +67,7 @@ def validate_json(data: Any) -> Tuple[bool, str]:
     #     return False, str(e)
 
 def function_calling_call(q: str) -> Tuple[bool, Any, str]:
-    resp = client.chat.completions.create(
+    resp = get_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "Return a JSON object that strictly matches the provided parameters schema."},
@@ -0,0 +1,155 @@
+"""
+Prompt-and-retry vs schema-guided decoding.
+
+Both methods run against an OpenAI-compatible endpoint (by default the local
+vLLM server from ../5-vllm/server.py) on two suites: MOVIE_SCHEMA with the
+function_call_fail.py prompts, and SCHEMA with the main.py prompts.
+
+- retry: function calling, validated with jsonschema. On failure the
+  validation error goes back to the model, up to --max-retries more times
+  (what instructor's max_retries does behind the scenes). The call is offered
+  with function_call="auto", not forced by name: vLLM (../5-vllm/server.py
+  and `vllm serve` alike) guides forced named calls with the schema, which
+  would make this arm guided too when it runs on the same server. A reply in
+  plain text is parsed as JSON instead.
+- guided: `response_format={"type": "json_schema", ...}`. The server constrains
+  decoding to the schema, so the output validates by construction.
+
+    uv run python guided_compare.py --base-url http://127.0.0.1:8001/v1
+    uv run python guided_compare.py --retry-base-url https://api.openai.com/v1   # baseline on gpt-4o-mini
+
+Reports validity rate, attempts per prompt, retries avoided and end-to-end latency.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsonschema import Draft202012Validator
+from openai import AsyncOpenAI
+
+from openai_client import get_async_client
+from function_call_fail import MOVIE_SCHEMA, PROMPTS as MOVIE_PROMPTS
+from main import PROMPTS, SCHEMA, try_extract_json
+
+SYSTEM = "Return a JSON object that strictly matches the provided schema."
+RETRY_SYSTEM = f"{SYSTEM} Call return_object with it."
+SUITES = {"MOVIE_SCHEMA": (MOVIE_SCHEMA, MOVIE_PROMPTS), "SCHEMA": (SCHEMA, PROMPTS)}
+
+
+def first_error(validator: Draft202012Validator, data: Any) -> Optional[str]:
+    error = next(iter(validator.iter_errors(data)), None)
+    return f"{'/'.join(map(str, error.path)) or '<root>'}: {error.message}" if error else None
+
+
+async def with_retries(
+    client: AsyncOpenAI, model: str, schema: Dict[str, Any], prompt: str, max_retries: int
+) -> Tuple[bool, int]:
+    """Unguided function call, re-asking with the validation error; returns (valid, attempts)"""
+    validator = Draft202012Validator(schema)
+    messages = [{"role": "system", "content": RETRY_SYSTEM}, {"role": "user", "content": prompt}]
+    for attempt in range(1, max_retries + 2):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            functions=[{"name": "return_object", "description": "Return the object", "parameters": schema}],
+            function_call="auto",  # a call forced by name is schema-guided on vLLM
+            temperature=0,
+        )
+        message = response.choices[0].message
+        if message.function_call:
+            arguments = message.function_call.arguments
+            error = None
+        else:  # answered in text instead of calling the function
+            found, data = try_extract_json(message.content or "")
+            arguments = json.dumps(data) if found else ""
+            error = None if found else "no return_object call and no JSON object in the reply"
+        if error is None:
+            try:
+                error = first_error(validator, json.loads(arguments))
+            except json.JSONDecodeError as e:
+                error = f"invalid JSON: {e}"
+        if error is None:
+            return True, attempt
+        if message.function_call:
+            messages.append({"role": "assistant", "content": None,
+                             "function_call": {"name": "return_object", "arguments": arguments}})
+        else:
+            messages.append({"role": "assistant", "content": message.content or ""})
+        messages.append({"role": "user", "content": f"That object failed validation ({error}). "
+                                                    "Call return_object again with a corrected object."})
+    return False, max_retries + 1
+
+
+async def guided(client: AsyncOpenAI, model: str, schema: Dict[str, Any], prompt: str) -> Tuple[bool, int]:
+    """One schema-constrained completion; returns (valid, attempts)"""
+    response = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": SYSTEM}, {"role": "user", "content": prompt}],
+        response_format={"type": "json_schema", "json_schema": {"name": "object", "schema": schema, "strict": True}},
+        temperature=0,
+    )
+    try:
+        return first_error(Draft202012Validator(schema), json.loads(response.choices[0].message.content)) is None, 1
+    except (json.JSONDecodeError, TypeError):
+        return False, 1
+
+
+async def run(method, prompts: List[str]) -> Dict[str, Any]:
+    valid, attempts, latencies = 0, 0, []
+    for prompt in prompts:
+        started = time.perf_counter()
+        try:
+            ok, tries = await method(prompt)
+        except Exception as e:
+            print(f"  ⚠️  {type(e).__name__}: {e}")
+            ok, tries = False, 1
+        latencies.append(time.perf_counter() - started)
+        valid += ok
+        attempts += tries
+    return {
+        "valid": valid,
+        "total": len(prompts),
+        "attempts": attempts,
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_p50_s": statistics.median(latencies),
+        "latency_total_s": sum(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt-and-retry vs schema-guided decoding")
+    parser.add_argument("--base-url", default=os.getenv("GUIDED_BASE_URL", "http://127.0.0.1:8001/v1"),
+                        help="endpoint with guided decoding (the local vLLM server)")
+    parser.add_argument("--retry-base-url", default=None, help="endpoint for the retry baseline (default: --base-url)")
+    parser.add_argument("--model", default="local")
+    parser.add_argument("--retry-model", default=None)
+    parser.add_argument("--max-retries", type=int, default=2)
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY") or "local"
+    guided_client = get_async_client(args.base_url, api_key=api_key)
+    retry_client = get_async_client(args.retry_base_url or args.base_url, api_key=api_key)
+    retry_model = args.retry_model or args.model
+
+    print(f"{'suite':<13} {'method':<8} {'valid':>7} {'attempts':>9} {'retries':>8} {'mean s':>8} {'p50 s':>7} {'total s':>8}")
+    for suite, (schema, prompts) in SUITES.items():
+        results = {
+            "retry": await run(lambda p: with_retries(retry_client, retry_model, schema, p, args.max_retries), prompts),
+            "guided": await run(lambda p: guided(guided_client, args.model, schema, p), prompts),
+        }
+        for method, r in results.items():
+            retries = r["attempts"] - r["total"]
+            print(f"{suite:<13} {method:<8} {r['valid']:>3}/{r['total']:<3} {r['attempts']:>9} {retries:>8} "
+                  f"{r['latency_mean_s']:>8.2f} {r['latency_p50_s']:>7.2f} {r['latency_total_s']:>8.2f}")
+        avoided = results["retry"]["attempts"] - results["guided"]["attempts"]
+        saved = results["retry"]["latency_total_s"] - results["guided"]["latency_total_s"]
+        print(f"{'':<13} guided decoding avoided {avoided} retries and saved {saved:.2f}s end to end\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1 @@
+../shared/openai_client.py
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Deterministic repair of near-miss JSON before paying for an LLM retry.
+
+    result = repair(model_text, SCHEMA)
+    if result.valid:
+        use(result.data)          # result.repairs lists what was fixed, e.g.
+                                  # ["extracted_object", "coerced:year", "pruned:notes"]
+
+Stages, each recorded as a tag when it changes something:
+
+1. Lenient parsing: strip code fences, extract the first balanced JSON object
+   from surrounding prose, fix trailing commas, smart quotes and Python
+   literals, and fall back to YAML or `key: value, key: value` text.
+2. Schema-driven coercion: match keys case-insensitively, coerce types
+   ("1972" -> 1972), match enums case-insensitively, wrap or truncate arrays,
+   take the first object when the schema wants one and got a list.
+3. Pruning: drop properties the schema does not allow.
+
+The result is then validated with jsonschema.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# yaml and jsonschema are imported on first use: callers import this module
+# up front but only repair the outputs that fail.
+
+FENCE_RE = re.compile(r"```(?:json|yaml|yml)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+SMART_QUOTES = {"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"}
+KEY_VALUE_RE = re.compile(r"(\w[\w ]*?)\s*:\s*(.+?)(?=,\s*\w[\w ]*?\s*:|$)")
+
+
+class RepairResult(NamedTuple):
+    data: Any
+    repairs: List[str]
+    valid: bool
+    error: Optional[str]
+
+
+def _balanced_objects(text: str) -> List[str]:
+    """Top-level {...} spans, skipping braces inside strings"""
+    spans, depth, start, in_string, escaped = [], 0, 0, False, False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                spans.append(text[start:i + 1])
+    return spans
+
+
+def _loads_fixed(text: str, repairs: List[str]) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    fixed = TRAILING_COMMA_RE.sub(r"\1", text)
+    for smart, plain in SMART_QUOTES.items():
+        fixed = fixed.replace(smart, plain)
+    fixed = re.sub(r"\b(True|False|None)\b", lambda m: PY_LITERALS[m.group(1)], fixed)
+    if "'" in fixed and '"' not in fixed:
+        fixed = fixed.replace("'", '"')
+    data = json.loads(fixed)  # let JSONDecodeError propagate
+    repairs.append("syntax_fix")
+    return data
+
+
+def parse_lenient(text: str) -> Tuple[Any, List[str]]:
+    """Best-effort parse of model output; raises ValueError when nothing usable is found"""
+    repairs: List[str] = []
+    text = (text or "").strip()
+    try:
+        return json.loads(text), repairs
+    except json.JSONDecodeError:
+        pass
+
+    fence = FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1).strip()
+        repairs.append("code_fence")
+
+    objects = _balanced_objects(text)
+    if objects:
+        if objects[0] != text:
+            repairs.append("extracted_object")
+        if len(objects) > 1:
+            repairs.append("first_of_many")
+        try:
+            return _loads_fixed(objects[0], repairs), repairs
+        except json.JSONDecodeError:
+            pass
+
+    import yaml
+    try:
+        data = yaml.safe_load(text)
+        if isinstance(data, (dict, list)):
+            repairs.append("yaml")
+            return data, repairs
+    except yaml.YAMLError:
+        pass
+
+    # "title: Spirited Away, director: Hayao Miyazaki, year: 2001"
+    pairs = KEY_VALUE_RE.findall(text.replace("\n", ", "))
+    if len(pairs) > 1:
+        repairs.append("key_value")
+        return {k.strip(): v.strip().strip("\"'") for k, v in pairs}, repairs
+    raise ValueError("no JSON object, YAML mapping or key: value pairs found")
+
+
+def _coerce(value: Any, schema: Dict[str, Any], path: str, repairs: List[str]) -> Any:
+    kind = schema.get("type")
+    where = path or "<root>"
+
+    if kind == "object":
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            repairs.append(f"first_of_many:{where}")
+            value = value[0]
+        if not isinstance(value, dict):
+            return value
+        properties = schema.get("properties", {})
+        by_lower = {name.lower(): name for name in properties}
+        out: Dict[str, Any] = {}
+        pruned = []
+        for key, item in value.items():
+            name = key if key in properties else by_lower.get(str(key).strip().lower().replace(" ", "_"))
+            if name is None:
+                if schema.get("additionalProperties", True) is False:
+                    pruned.append(str(key))
+                    continue
+                out[key] = item
+                continue
+            if name != key:
+                repairs.append(f"renamed:{key}->{name}")
+            out[name] = _coerce(item, properties[name], f"{path}.{name}" if path else name, repairs)
+        if pruned:
+            repairs.append(f"pruned:{','.join(pruned)}")
+        return out
+
+    if kind == "array":
+        if not isinstance(value, list):
+            value = [value]
+            repairs.append(f"wrapped:{where}")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            value = value[:schema["maxItems"]]
+            repairs.append(f"truncated:{where}")
+        return [_coerce(item, schema.get("items", {}), f"{path}[{i}]", repairs) for i, item in enumerate(value)]
+
+    original = value
+    if kind == "integer" and isinstance(value, str) and re.fullmatch(r"\s*-?\d+\s*", value):
+        value = int(value)
+    elif kind == "integer" and isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif kind == "number" and isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    elif kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    elif kind == "boolean" and isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        value = value.strip().lower() == "true"
+
+    if isinstance(value, str):
+        if "enum" in schema and value not in schema["enum"]:
+            match = next((e for e in schema["enum"] if str(e).lower() == value.strip().lower()), None)
+            value = match if match is not None else value
+        if "pattern" in schema and not re.search(schema["pattern"], value):
+            for candidate in (value.strip(), value.strip().upper()):
+                if re.search(schema["pattern"], candidate):
+                    value = candidate
+                    break
+    if value != original or type(value) is not type(original):
+        repairs.append(f"coerced:{where}")
+    return value
+
+
+def repair(text: str, schema: Dict[str, Any]) -> RepairResult:
+    """Parse, coerce and prune model output towards `schema`, then validate it"""
+    from jsonschema import Draft202012Validator
+    try:
+        data, repairs = parse_lenient(text)
+    except ValueError as e:
+        return RepairResult(None, [], False, str(e))
+    data = _coerce(data, schema, "", repairs)
+    error = next(iter(Draft202012Validator(schema).iter_errors(data)), None)
+    return RepairResult(data, repairs, error is None, error.message if error else None)
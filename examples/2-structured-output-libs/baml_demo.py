@@ -1,11 +1,29 @@
+import os
+
 from baml_client import b
 from baml_client.types import Task
+from baml_py import ClientRegistry
 from dotenv import load_dotenv
 load_dotenv()
 
 
+def baml_options() -> dict:
+    """Route BAML to $OPENAI_BASE_URL (e.g. the local mock server) when it is set"""
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if not base_url:
+        return {}
+    registry = ClientRegistry()
+    registry.add_llm_client(name="Local", provider="openai", options={
+        "model": "gpt-4o",
+        "base_url": base_url,
+        "api_key": os.getenv("OPENAI_API_KEY", "mock"),
+    })
+    registry.set_primary("Local")
+    return {"client_registry": registry}
+
+
 def extract_task(text: str) -> Task:
-    task = b.ExtractTask(text=text)
+    task = b.ExtractTask(text=text, baml_options=baml_options())
     return task
 
 def main():
@@ -1,4 +1,7 @@
+import argparse
 import asyncio
+import importlib
+import os
 from typing import Dict, Any, List
 from rich.table import Table
 from rich.console import Console
@@ -35,29 +38,63 @@ def run_runner(label: str, mod, fn_name="extract_task"):
     console.print(table)
     return acc
 
+def run_cascades(min_confidence: float) -> Dict[str, Dict[str, float]]:
+    """Accuracy, mean latency and cost for each cascade configuration"""
+    from cascade import CASCADES, Cascade
+
+    rows = {}
+    for name, clients in CASCADES.items():
+        cascade = Cascade(clients, min_confidence=min_confidence)
+        acc = run_runner(f"Cascade: {name}", cascade)
+        rows[name] = {**acc, **cascade.summary()}
+
+    table = Table(title=f"Cascades (escalate on invalid output or confidence < {min_confidence})")
+    for column in ("Cascade", "overall", "mean latency s", "cost $", "escalated"):
+        table.add_column(column)
+    for name, row in rows.items():
+        table.add_row(name, f"{row['overall']:.3f}", f"{row['mean_latency_s']:.2f}",
+                      f"{row['cost_usd']:.5f}", f"{row['escalation_rate']:.0%}")
+    console.print(table)
+    return rows
+
+# label -> demo module, imported only when selected so a single-library run
+# does not pay for loading the others
+LIBRARIES = {
+    "instructor": ("Instructor", "instructor_demo"),
+    "pydanticai": ("PydanticAI", "pydanticai_demo"),
+    "baml": ("BAML", "baml_demo"),
+    "guided": ("Guided (vLLM)", "guided_demo"),  # needs the local vLLM server from ../5-vllm
+}
+
 def main():
+    parser = argparse.ArgumentParser(description="Accuracy benchmark for the structured-output libraries")
+    parser.add_argument("--libs", default="instructor,pydanticai,baml",
+                        help=f"comma-separated subset of {','.join(LIBRARIES)} "
+                             "(guided is added when GUIDED_BASE_URL is set)")
+    parser.add_argument("--cascades", action="store_true", help="also benchmark the BAML model cascades")
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    args = parser.parse_args()
+    libs = [name.strip() for name in args.libs.split(",") if name.strip()]
+    if os.getenv("GUIDED_BASE_URL") and "guided" not in libs:
+        libs.append("guided")
+    unknown = [name for name in libs if name not in LIBRARIES]
+    if unknown:
+        parser.error(f"unknown --libs {unknown}; choose from {list(LIBRARIES)}")
     results = {}
 
-    # Test Instructor
-    try:
-        import instructor_demo
-        results["Instructor"] = run_runner("Instructor", instructor_demo)
-    except Exception as e:
-        console.print(f"[red]Failed to run Instructor: {e}[/red]")
-
-    # Test PydanticAI
-    try:
-        import pydanticai_demo
-        results["PydanticAI"] = run_runner("PydanticAI", pydanticai_demo)
-    except Exception as e:
-        console.print(f"[red]Failed to run PydanticAI: {e}[/red]")
+    for name in libs:
+        label, module = LIBRARIES[name]
+        try:
+            results[label] = run_runner(label, importlib.import_module(module))
+        except Exception as e:
+            console.print(f"[red]Failed to run {label}: {e}[/red]")
 
-    # Test BAML
-    try:
-        import baml_demo
-        results["BAML"] = run_runner("BAML", baml_demo)
-    except Exception as e:
-        console.print(f"[red]Failed to run BAML: {e}[/red]")
+    if args.cascades:
+        try:
+            for name, row in run_cascades(args.min_confidence).items():
+                results[f"Cascade: {name}"] = row
+        except Exception as e:
+            console.print(f"[red]Failed to run cascades: {e}[/red]")
 
     console.print("[bold]\nSummary[/bold]")
     for k, v in results.items():
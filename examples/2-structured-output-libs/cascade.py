@@ -0,0 +1,110 @@
+"""
+Validation-driven model cascade for Task extraction (BAML).
+
+Try the cheapest, fastest client first and escalate to a stronger one only if
+the output fails validation against `schema.Task`, or if its `confidence` is
+below `min_confidence`. The last client's answer is returned as-is.
+
+    cascade = Cascade(["CustomGPT4oMini", "CustomGPT4o"], min_confidence=0.7)
+    task = cascade.extract_task(text)
+    cascade.summary()   # mean latency, cost and escalation rate so far
+
+The client names are the ones defined in baml_src/clients.baml. Token usage
+comes from a BAML Collector, and cost uses the per-million-token PRICES below.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from baml_client import b
+from baml_py import ClientRegistry, Collector
+from pydantic import ValidationError
+from schema import Task
+from dotenv import load_dotenv
+load_dotenv()
+
+# USD per 1M (input, output) tokens
+PRICES: Dict[str, Tuple[float, float]] = {
+    "CustomGPT4oMini": (0.15, 0.60),
+    "CustomGPT4o": (2.50, 10.00),
+    "CustomHaiku": (0.25, 1.25),
+    "CustomSonnet": (3.00, 15.00),
+}
+
+CASCADES: Dict[str, List[str]] = {
+    "gpt-4o-mini": ["CustomGPT4oMini"],
+    "gpt-4o": ["CustomGPT4o"],
+    "gpt-4o-mini -> gpt-4o": ["CustomGPT4oMini", "CustomGPT4o"],
+    "haiku -> sonnet": ["CustomHaiku", "CustomSonnet"],
+    "gpt-4o-mini -> haiku -> sonnet": ["CustomGPT4oMini", "CustomHaiku", "CustomSonnet"],
+}
+
+
+class Cascade:
+    """Escalates through BAML clients until an extraction validates with enough confidence"""
+
+    def __init__(self, clients: Sequence[str], min_confidence: float = 0.7):
+        self.clients = list(clients)
+        self.min_confidence = min_confidence
+        self.calls: List[Dict[str, object]] = []
+
+    def _call(self, client: str, text: str) -> Tuple[Optional[Task], Optional[str], float]:
+        """One extraction with `client`; returns (task, rejection reason, cost)"""
+        registry = ClientRegistry()
+        registry.set_primary(client)
+        collector = Collector(name=f"cascade-{client}")
+        task, reason = None, None
+        try:
+            result = b.ExtractTask(text=text, baml_options={"client_registry": registry, "collector": collector})
+            task = Task.model_validate(result.model_dump())
+            if task.confidence < self.min_confidence:
+                reason = f"confidence {task.confidence:.2f} < {self.min_confidence}"
+        except ValidationError as e:
+            reason = f"invalid: {e.error_count()} error(s)"
+        except Exception as e:  # BAML parse or client errors
+            reason = f"{type(e).__name__}: {str(e)[:80]}"
+        usage = collector.last.usage if collector.last else None
+        input_price, output_price = PRICES.get(client, (0.0, 0.0))
+        cost = 0.0
+        if usage is not None:
+            cost = ((usage.input_tokens or 0) * input_price + (usage.output_tokens or 0) * output_price) / 1e6
+        return task, reason, cost
+
+    def extract_task(self, text: str) -> Task:
+        started = time.perf_counter()
+        cost, tried, task = 0.0, [], None
+        for client in self.clients:
+            candidate, reason, call_cost = self._call(client, text)
+            cost += call_cost
+            tried.append(client if reason is None else f"{client} ({reason})")
+            task = candidate or task
+            if reason is None:
+                break
+        self.calls.append({
+            "latency": time.perf_counter() - started,
+            "cost": cost,
+            "escalations": len(tried) - 1,
+            "tried": tried,
+        })
+        if task is None:
+            raise ValueError(f"no client produced a valid Task: {tried}")
+        return task
+
+    def summary(self) -> Dict[str, float]:
+        n = len(self.calls) or 1
+        return {
+            "mean_latency_s": round(sum(c["latency"] for c in self.calls) / n, 3),
+            "cost_usd": round(sum(c["cost"] for c in self.calls), 6),
+            "escalation_rate": round(sum(c["escalations"] > 0 for c in self.calls) / n, 3),
+        }
+
+
+def main():
+    demo = "draft the demo slides for Friday; urgent; assign to @alex; tag: presentation"
+    cascade = Cascade(CASCADES["gpt-4o-mini -> gpt-4o"])
+    print(cascade.extract_task(demo).model_dump_json(indent=2))
+    print(cascade.calls[-1]["tried"], cascade.summary())
+
+
+if __name__ == "__main__":
+    main()
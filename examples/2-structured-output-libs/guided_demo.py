@@ -0,0 +1,79 @@
+"""
+Task extraction with schema-guided decoding on the local vLLM server.
+
+`Task.model_json_schema()` is sent as `response_format`, and ../5-vllm/server.py
+compiles it into a grammar, so every completion parses as a Task on the first
+try. Compare it with instructor's validate-and-retry loop on the same samples:
+
+    uv run python guided_demo.py --compare
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from openai_client import get_client
+from schema import Task
+from prompts import SYSTEM, USER_TEMPLATE
+from dotenv import load_dotenv
+load_dotenv()
+
+GUIDED_BASE_URL = os.getenv("GUIDED_BASE_URL", "http://127.0.0.1:8001/v1")
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "Task", "schema": Task.model_json_schema(), "strict": True},
+}
+
+
+def extract_task(text: str) -> Task:
+    client = get_client(GUIDED_BASE_URL, api_key=os.getenv("OPENAI_API_KEY") or "local")
+    response = client.chat.completions.create(
+        model="local",
+        temperature=0,
+        messages=[
+            {"role": "system", "content": SYSTEM},
+            {"role": "user", "content": USER_TEMPLATE.format(TEXT=text)},
+        ],
+        response_format=RESPONSE_FORMAT,
+    )
+    return Task.model_validate_json(response.choices[0].message.content)
+
+
+def compare() -> None:
+    """Guided decoding vs instructor (max_retries=2) on data.SAMPLES"""
+    import instructor_demo
+    from data import SAMPLES
+
+    calls = {"n": 0}
+    instructor_demo.instructor_client().on("completion:kwargs", lambda *args, **kwargs: calls.__setitem__("n", calls["n"] + 1))
+
+    for label, fn in (("instructor", instructor_demo.extract_task), ("guided", extract_task)):
+        valid, latencies = 0, []
+        calls["n"] = 0
+        for text in SAMPLES:
+            started = time.perf_counter()
+            try:
+                fn(text)
+                valid += 1
+            except Exception as e:
+                print(f"  ⚠️  {label}: {type(e).__name__}: {str(e)[:120]}")
+            latencies.append(time.perf_counter() - started)
+        attempts = calls["n"] if label == "instructor" else len(SAMPLES)
+        print(f"{label:<11} valid {valid}/{len(SAMPLES)}  LLM calls {attempts}  retries {attempts - len(SAMPLES)}  "
+              f"latency mean {statistics.mean(latencies):.2f}s p50 {statistics.median(latencies):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task extraction with guided decoding")
+    parser.add_argument("--compare", action="store_true", help="compare with instructor's retry loop")
+    args = parser.parse_args()
+    if args.compare:
+        compare()
+        return
+    demo = "draft the demo slides for Friday; urgent; assign to @alex; tag: presentation"
+    print(extract_task(demo).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
-from openai import OpenAI
+from functools import lru_cache
 import instructor
+from openai_client import get_client
 from schema import Task
 from prompts import SYSTEM, USER_TEMPLATE
 from dotenv import load_dotenv
 load_dotenv()
 
-client = instructor.from_openai(OpenAI())
+@lru_cache(maxsize=None)
+def instructor_client():
+    """The instructor-patched pooled client, built on first use"""
+    return instructor.from_openai(get_client())
 
 def extract_task(text: str, max_retries: int = 2) -> Task:
-    return client.chat.completions.create(
+    return instructor_client().chat.completions.create(
         model="gpt-4o-mini",
         response_model=Task,
         temperature=0,
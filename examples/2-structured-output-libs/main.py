@@ -1,9 +1,8 @@
 import asyncio
 import os, re, json, sys, time
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from openai_client import get_async_client
 load_dotenv()
-client = AsyncOpenAI()
 
 SYSTEM = "Return ONLY a JSON object matching the requested schema."
 SCHEMA = {
@@ -83,7 +82,7 @@ def valid_movie(d):
     return True
 
 async def raw_json(prompt: str):
-    output = await client.chat.completions.create(
+    output = await get_async_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role":"system","content":SYSTEM},
                   {"role":"user","content":SCHEMA_HINT + f'\nCreate object for: "{prompt}"'}]
@@ -94,7 +93,7 @@ async def raw_json(prompt: str):
     return ok and valid_movie(data), data, results
 
 async def function_call(prompt: str):
-    output = await client.chat.completions.create(
+    output = await get_async_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role":"system","content":"Extract a movie object."},
                   {"role":"user","content":prompt}],
@@ -1,18 +1,20 @@
 import asyncio
 from pydantic_ai import Agent
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
 from schema import Task
 from prompts import SYSTEM, USER_TEMPLATE
+from openai_client import get_async_client
 from dotenv import load_dotenv
 load_dotenv()
 
-agent = Agent(
-    "openai:gpt-4o-mini",
-    instructions=SYSTEM,
-    output_type=Task,
-)
+def make_agent() -> Agent:
+    # Built per call so the model uses the pooled client of the running event loop
+    model = OpenAIChatModel("gpt-4o-mini", provider=OpenAIProvider(openai_client=get_async_client()))
+    return Agent(model, instructions=SYSTEM, output_type=Task)
 
 async def extract_task(text: str) -> Task:
-    result = await agent.run(USER_TEMPLATE.format(TEXT=text))
+    result = await make_agent().run(USER_TEMPLATE.format(TEXT=text))
     return result.output
 
 async def main():
@@ -0,0 +1,97 @@
+"""
+Growth / latency benchmark for MemoryStore on a long synthetic conversation.
+
+Summaries are replaced by the raw text so the run is offline (only the
+sentence-transformers model is needed). Compares the store with write-time
+consolidation off and on.
+
+    python bench_memory.py --turns 2000 --threshold 0.9
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List
+
+from memory import MemoryStore
+
+FACTS = [
+    "I live in {city}.",
+    "My favourite pizza topping is {food}.",
+    "I work as a {job}.",
+    "My dog is called {name}.",
+    "I am learning {lang} this year.",
+]
+FILLERS = {
+    "city": ["NYC", "Berlin", "Tel Aviv", "Lisbon"],
+    "food": ["anchovy", "mushroom", "pepperoni"],
+    "job": ["data engineer", "teacher", "nurse"],
+    "name": ["Rex", "Luna", "Bolt"],
+    "lang": ["Rust", "Spanish", "piano"],
+}
+QUERIES = ["Where do I live?", "What pizza do I like?", "What is my job?", "What's my dog's name?"]
+
+
+class OfflineMemoryStore(MemoryStore):
+    async def _summarize(self, text: str) -> str:
+        return text
+
+
+def synthetic_conversation(turns: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(turns):
+        fact = rng.choice(FACTS)
+        key = fact[fact.index("{") + 1:fact.index("}")]
+        text = fact.format(**{key: rng.choice(FILLERS[key])})
+        # The assistant mostly echoes the user back, as chat models do.
+        out.append(text if rng.random() < 0.5 else f"Got it - {text[0].lower()}{text[1:]}")
+    return out
+
+
+def search_latency_ms(store: MemoryStore, repeats: int = 20) -> float:
+    samples = []
+    for _ in range(repeats):
+        for q in QUERIES:
+            t0 = time.perf_counter()
+            store.search(q)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+async def run(label: str, store: MemoryStore, texts: List[str], every: int):
+    print(f"\n{label}")
+    print(f"{'turn':>6} {'index':>7} {'live':>6} {'rows/turn':>10} {'search p50 ms':>14}")
+    prev_size, prev_turn = 0, 0
+    for turn, text in enumerate(texts, 1):
+        await store.save(text)
+        if turn % every == 0 or turn == len(texts):
+            if store._compaction is not None:
+                await store._compaction
+            s = store.stats()
+            growth = (s["index_size"] - prev_size) / (turn - prev_turn)
+            print(f"{turn:>6} {s['index_size']:>7} {s['live']:>6} {growth:>10.3f} {search_latency_ms(store):>14.3f}")
+            prev_size, prev_turn = s["index_size"], turn
+    print(store.stats())
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=200, help="report interval (turns)")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--mode", choices=["skip", "merge"], default="merge")
+    parser.add_argument("--compact-every", type=int, default=250)
+    args = parser.parse_args()
+
+    texts = synthetic_conversation(args.turns)
+    await run("consolidation off", OfflineMemoryStore(), texts, args.every)
+    await run(f"consolidation on ({args.mode}, threshold={args.threshold})",
+              OfflineMemoryStore(dedup_threshold=args.threshold, dedup_mode=args.mode,
+                                 compact_every=args.compact_every),
+              texts, args.every)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,18 +4,17 @@ from memory import ShortTermMemory, MemoryStore
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import AsyncOpenAI
+from openai_client import get_async_client
 
 
 class Agent:
     def __init__(self):
         self.stm = ShortTermMemory()
         self.ltm = MemoryStore()
-        self.client = AsyncOpenAI()
     
     async def _answer_query(self, context: List[dict]) -> dict:
         """Generate an answer based on the provided context."""
-        output = await self.client.chat.completions.create(
+        output = await get_async_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=context
         )
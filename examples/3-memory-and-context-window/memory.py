@@ -1,41 +1,148 @@
-from sentence_transformers import SentenceTransformer
 from pydantic import BaseModel, Field, PrivateAttr
-import faiss
-from typing import List, Tuple
+import asyncio
+import logging
+import numpy as np
+from typing import Any, List, Literal, Optional, Tuple
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import AsyncOpenAI
-client = AsyncOpenAI()
+# faiss, sentence-transformers (and with it torch) and the OpenAI client are
+# imported on first use, so importing this module stays cheap.
+
+logger = logging.getLogger(__name__)
+
+def _faiss():
+    import faiss
+    return faiss
 
 class MemoryStore(BaseModel):
     model_name: str = "all-MiniLM-L6-v2"
-    
+    # Write-time consolidation (off by default): a new summary whose cosine
+    # similarity to a stored one is >= dedup_threshold is either dropped
+    # ("skip") or replaces that neighbour ("merge", the newer summary wins).
+    dedup_threshold: Optional[float] = None
+    dedup_mode: Literal["skip", "merge"] = "skip"
+    dedup_neighbours: int = 4
+    # Rebuild the index in the background every N saves, dropping merged-away
+    # rows and near-duplicates that slipped in before the threshold was set.
+    compact_every: Optional[int] = None
+
     def model_post_init(self, __context) -> None:
         # Manual assignment without PrivateAttr
         self._texts = []
+        self._live = []
+        self._stale = 0
         self._emb_dim = 384
-        self._index = faiss.IndexFlatL2(self._emb_dim)
-        self._embedder = SentenceTransformer(self.model_name)
+        self._index = _faiss().IndexFlatL2(self._emb_dim)
+        self._embedder = None
+        self._lock = asyncio.Lock()
+        self._compaction = None
+        self._stats = {"saves": 0, "added": 0, "skipped": 0, "merged": 0, "compactions": 0}
 
-    async def save(self, text: str):
-        output = await client.chat.completions.create(
+    @property
+    def embedder(self) -> Any:
+        """The SentenceTransformer for `model_name`, loaded on first encode"""
+        if self._embedder is None:
+            from sentence_transformers import SentenceTransformer
+            self._embedder = SentenceTransformer(self.model_name)
+        return self._embedder
+
+    async def _summarize(self, text: str) -> str:
+        from openai_client import get_async_client
+        output = await get_async_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role":"system","content":"give me a short summary of the following text"},
                     {"role":"user","content":text}]
         )
-    
-        summary = output.choices[0].message.content
+        return output.choices[0].message.content
+
+    async def save(self, text: str):
+        summary = await self._summarize(text)
+        emb = self.embedder.encode([summary])
+
+        async with self._lock:
+            self._stats["saves"] += 1
+            dup = self._find_duplicate(emb[0]) if self.dedup_threshold is not None else None
+            if dup is not None and self.dedup_mode == "skip":
+                self._stats["skipped"] += 1
+            else:
+                if dup is not None:
+                    self._live[dup] = False
+                    self._stale += 1
+                    self._stats["merged"] += 1
+                else:
+                    self._stats["added"] += 1
+                self._index.add(emb)
+                self._texts.append(summary)
+                self._live.append(True)
+
+        if self.compact_every and self._stats["saves"] % self.compact_every == 0 and self._compaction is None:
+            self._compaction = asyncio.create_task(self.compact())
+            self._compaction.add_done_callback(self._compaction_done)
+
+    def _find_duplicate(self, vec: np.ndarray) -> Optional[int]:
+        if not self._index.ntotal: return None
+        k = min(self.dedup_neighbours + self._stale, self._index.ntotal)
+        _, I = self._index.search(vec[None, :], k)
+        q = vec / (np.linalg.norm(vec) or 1.0)
+        for i in I[0]:
+            if i < 0 or not self._live[i]: continue
+            v = self._index.reconstruct(int(i))
+            if float(q @ (v / (np.linalg.norm(v) or 1.0))) >= self.dedup_threshold:
+                return int(i)
+        return None
+
+    def _rebuild(self, vectors: np.ndarray, live: List[bool]) -> Tuple[Any, List[int]]:
+        """Index over a snapshot of the rows, without dead rows and near-duplicates; returns (index, kept rows)"""
+        threshold = self.dedup_threshold if self.dedup_threshold is not None else 1.0 + 1e-6
+        index = _faiss().IndexFlatIP(self._emb_dim)
+        kept = []
+        # Newest first, so the most recent summary of a fact is the one kept.
+        for i in reversed(range(len(vectors))):
+            if not live[i]: continue
+            v = (vectors[i] / (np.linalg.norm(vectors[i]) or 1.0))[None, :].astype(np.float32)
+            if index.ntotal:
+                D, _ = index.search(v, 1)
+                if D[0][0] >= threshold: continue
+            index.add(v)
+            kept.append(i)
+        kept.reverse()
+        rebuilt = _faiss().IndexFlatL2(self._emb_dim)
+        if kept:
+            rebuilt.add(vectors[kept])
+        return rebuilt, kept
+
+    async def compact(self):
+        # Snapshot under the lock, rebuild without it so save() keeps going,
+        # then swap in the new index and replay the writes made meanwhile.
+        async with self._lock:
+            n = self._index.ntotal
+            vectors = self._index.reconstruct_n(0, n) if n else np.empty((0, self._emb_dim), np.float32)
+            live = list(self._live)
+        index, kept = await asyncio.get_running_loop().run_in_executor(None, self._rebuild, vectors, live)
+        async with self._lock:
+            if self._index.ntotal > n:
+                index.add(self._index.reconstruct_n(n, self._index.ntotal - n))
+            # Rows merged away since the snapshot stay in the new index as stale
+            self._live = [self._live[i] for i in kept] + self._live[n:]
+            self._texts = [self._texts[i] for i in kept] + self._texts[n:]
+            self._index, self._stale = index, self._live.count(False)
+            self._stats["compactions"] += 1
+
+    def _compaction_done(self, task: "asyncio.Task") -> None:
+        self._compaction = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("background compaction failed", exc_info=task.exception())
 
-        emb = self._embedder.encode([summary])
-        self._index.add(emb)
-        self._texts.append(summary)
+    def stats(self) -> dict:
+        return {**self._stats, "index_size": self._index.ntotal,
+                "live": self._index.ntotal - self._stale, "stale": self._stale}
 
     def search(self, query: str, k: int = 3) -> List[str]:
-        if not self._texts: return []
-        emb = self._embedder.encode([query])
-        D, I = self._index.search(emb, min(k, len(self._texts)))
-        return [self._texts[i] for i in I[0]]
+        if len(self._texts) == self._stale: return []
+        emb = self.embedder.encode([query])
+        D, I = self._index.search(emb, min(k + self._stale, len(self._texts)))
+        return [self._texts[i] for i in I[0] if i >= 0 and self._live[i]][:k]
 
 class ShortTermMemory(BaseModel):
     window: int = 6
@@ -43,4 +150,4 @@ class ShortTermMemory(BaseModel):
     def append(self, role: str, content: str):
         self.messages.append((role, content))
     def last_window(self):
-        return self.messages[-self.window:]
\ No newline at end of file
+        return self.messages[-self.window:]
@@ -0,0 +1,109 @@
+"""
+Benchmark the AST-compiled calculator against the original eval() path.
+
+    python bench_calculator.py --number 20000
+"""
+import argparse
+import math
+import random
+import time
+import timeit
+
+from calculator import compile_expression, evaluate
+
+
+def legacy_calculator(expression: str) -> str:
+    """The original Tools.calculator implementation, kept for comparison"""
+    try:
+        allowed_names = {
+            k: v for k, v in math.__dict__.items()
+            if not k.startswith("__")
+        }
+        allowed_names.update({"abs": abs, "round": round, "pow": pow})
+        if any(char in expression for char in ['import', '__', 'exec', 'eval', 'open', 'file']):
+            return "Error: Potentially unsafe expression"
+        result = eval(expression, {"__builtins__": {}}, allowed_names)
+        return f"Calculation result: {result}"
+    except Exception as e:
+        return f"Calculation error: {str(e)}"
+
+
+def ast_calculator(expression: str) -> str:
+    try:
+        return f"Calculation result: {evaluate(expression)}"
+    except Exception as e:
+        return f"Calculation error: {str(e)}"
+
+
+TEMPLATES = [
+    "{a} * {b} + {c}",
+    "{a} / {b}",
+    "sqrt({a}) + {b}",
+    "({a} + {b}) * ({c} - {a}) / {b}",
+    "round(log({a}) * {b}, 2)",
+    "pow({a}, 3) - {c} % {b}",
+    "sin({a}) ** 2 + cos({a}) ** 2",
+    "factorial({small})",
+]
+
+
+# Sandbox escapes and inputs whose big-int work would run for seconds or hours
+PAYLOADS = [
+    "(1).real",
+    "[c for c in ().__class__.__bases__]",
+    "pow(9, 10**8)",
+    "((9**9999)**9999)",
+    "(9**4000)**9999",
+    "comb(10**6, 5*10**5)",
+    "factorial(10**6)",
+    "perm(10**7)",
+    "(10**4000) * (10**4000)",
+    "round(5, -10**8)",
+]
+HANGS_EVAL = {"pow(9, 10**8)", "((9**9999)**9999)", "(9**4000)**9999", "comb(10**6, 5*10**5)",
+              "factorial(10**6)", "perm(10**7)", "round(5, -10**8)"}
+
+
+def workload(size: int, unique: float, seed: int = 0) -> list:
+    """Expression mix where `unique` is the fraction never seen before"""
+    rng = random.Random(seed)
+
+    def make():
+        return rng.choice(TEMPLATES).format(
+            a=rng.randint(1, 999), b=rng.randint(1, 99), c=rng.randint(1, 9999), small=rng.randint(1, 20)
+        )
+
+    pool = [make() for _ in range(32)]
+    return [make() if rng.random() < unique else rng.choice(pool) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="expressions per mix")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mix':<22} {'eval us/expr':>13} {'ast us/expr':>12} {'speedup':>8}")
+    for label, unique in [("repeated (agent-like)", 0.05), ("half unique", 0.5), ("all unique", 1.0)]:
+        exprs = workload(args.number, unique)
+        for e in exprs[:50]:
+            assert legacy_calculator(e) == ast_calculator(e), e
+        compile_expression.cache_clear()
+        legacy = min(timeit.repeat(lambda: [legacy_calculator(e) for e in exprs], number=1, repeat=args.repeat))
+        compile_expression.cache_clear()
+        ast_ = min(timeit.repeat(lambda: [ast_calculator(e) for e in exprs], number=1, repeat=args.repeat))
+        print(f"{label:<22} {legacy / len(exprs) * 1e6:>13.2f} {ast_ / len(exprs) * 1e6:>12.2f} {legacy / ast_:>7.1f}x")
+
+    print("\nPayloads")
+    for payload in PAYLOADS:
+        short = payload if len(payload) < 40 else payload[:37] + "..."
+        legacy = "skipped (would hang)" if payload in HANGS_EVAL else legacy_calculator(payload)[:80]
+        started = time.perf_counter()
+        result = ast_calculator(payload)
+        elapsed = time.perf_counter() - started
+        print(f"  {short:<40} eval: {legacy}")
+        print(f"  {'':<40} ast:  {result[:80]} ({elapsed * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
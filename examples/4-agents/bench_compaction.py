@@ -0,0 +1,68 @@
+"""
+Compare per-iteration prompt size and latency of react_loop with conversation
+compaction off and on.
+
+    python bench_compaction.py --max-prompt-tokens 1500
+
+Tool-heavy queries make the effect visible; pointing AGENT_SEARCH_CORPUS at a
+real corpus gives long search results.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+
+from compaction import CompactionPolicy
+from main import Agent
+
+QUERIES = [
+    "One at a time, search for python, then react, then openai, then javascript, then ai, "
+    "and finally summarise everything you found in two sentences.",
+    "Calculate 2**10, then 3**7, then sqrt(2) * 1000, then search for information about the weather, "
+    "and add the three numbers together.",
+]
+
+
+async def run(policy, queries):
+    rows = []
+    for query in queries:
+        agent = Agent(compaction=policy, tool_cache=None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            await agent.react_loop(query)
+        rows.append(agent.iteration_stats)
+    return rows
+
+
+def report(label, runs):
+    print(f"\n{label}")
+    print(f"{'query':>5} {'iter':>4} {'prompt tok':>10} {'latency ms':>10}")
+    total_tokens = total_latency = over = 0
+    for q, stats in enumerate(runs, 1):
+        for s in stats:
+            total_tokens += s["prompt_tokens"] or 0
+            total_latency += s["latency"]
+            over += bool(s["over_budget"])
+            flag = "  over budget" if s["over_budget"] else ""
+            print(f"{q:>5} {s['iteration']:>4} {s['prompt_tokens'] or '-':>10} {s['latency'] * 1000:>10.0f}{flag}")
+    print(f"total prompt tokens: {total_tokens}, total reasoning latency: {total_latency:.2f}s"
+          + (f", {over} iteration(s) over budget" if over else ""))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-prompt-tokens", type=int, default=1500)
+    parser.add_argument("--keep-recent", type=int, default=2)
+    parser.add_argument("--truncate-to", type=int, default=200)
+    args = parser.parse_args()
+
+    policy = CompactionPolicy(
+        max_prompt_tokens=args.max_prompt_tokens,
+        keep_recent_tool_results=args.keep_recent,
+        truncate_to_chars=args.truncate_to,
+    )
+    report("compaction off", await run(None, QUERIES))
+    report(f"compaction on ({policy})", await run(policy, QUERIES))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Throughput benchmark for AgentScheduler.
+
+Runs the same batch of sessions at increasing concurrency and reports
+sessions/min, end-to-end latency percentiles and rate-limit behaviour. Point
+OPENAI_BASE_URL at a local mock server to benchmark without live API calls.
+
+    python bench_scheduler.py --sessions 64 --concurrency 1,4,16,64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai_client import pool_stats
+from scheduler import AgentScheduler, LLMGate
+
+QUERIES = [
+    "What is 15 * 23 + 47?",
+    "I need to know about Python programming and then calculate 100 divided by 4",
+    "Search for information about ReAct and tell me what it is",
+    "Calculate the square root of 144 and then search for information about OpenAI",
+]
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="cap on in-flight LLM calls (default: same as session concurrency)")
+    args = parser.parse_args()
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.sessions)]
+    print(f"{'sessions':>8} {'conc':>5} {'sess/min':>9} {'p50 s':>7} {'p95 s':>7} {'queued p95':>10} {'429s':>5} {'errors':>6}")
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        gate = LLMGate(max_concurrency=args.llm_concurrency or concurrency)
+        scheduler = AgentScheduler(max_sessions=concurrency, gate=gate, agent_kwargs={"tool_cache": None})
+        t0 = time.perf_counter()
+        results = await scheduler.run(queries)
+        elapsed = time.perf_counter() - t0
+        scheduler.close()
+
+        latencies = [r.latency for r in results]
+        queued = [r.queued for r in results]
+        errors = sum(r.error is not None for r in results)
+        print(f"{len(results):>8} {concurrency:>5} {len(results) / elapsed * 60:>9.1f} "
+              f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+              f"{percentile(queued, 95):>10.2f} {gate.stats['rate_limited']:>5} {errors:>6}")
+    for name, stats in pool_stats().items():
+        print(f"\npool {name}: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
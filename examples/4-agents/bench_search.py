@@ -0,0 +1,93 @@
+"""
+Query-latency benchmark for the BM25 search backend.
+
+Generates synthetic corpora with a Zipfian vocabulary that grows with the
+corpus (Heaps' law), indexes each one, and measures query latency. Latency
+follows the postings a query touches, not the corpus size, so the fitted
+p50 scaling exponent should stay well below 1. About one query term in five
+is a head term whose postings grow linearly with the corpus; those queries
+set p95 and show the worst case.
+
+    python bench_search.py --sizes 10000,100000,1000000,3000000
+"""
+import argparse
+import bisect
+import itertools
+import json
+import math
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from search_index import SearchIndex
+
+
+def vocabulary_size(num_docs: int) -> int:
+    return int(60 * num_docs ** 0.6) + 1000
+
+
+def write_corpus(path: Path, num_docs: int, doc_len: int = 60, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    vocab = vocabulary_size(num_docs)
+    cum = list(itertools.accumulate(1 / (r ** 1.07) for r in range(1, vocab + 1)))
+    total = cum[-1]
+    with open(path, "w") as f:
+        for doc in range(num_docs):
+            words = [f"w{bisect.bisect(cum, rng.random() * total)}" for _ in range(doc_len)]
+            f.write(json.dumps({"id": str(doc), "text": " ".join(words)}) + "\n")
+    return vocab
+
+
+def queries(vocab: int, n: int, seed: int = 1):
+    rng = random.Random(seed)
+    # Mostly content-word-like terms, but one term in five comes from the head
+    # of the distribution so the longest postings lists are part of the mix
+    def term():
+        return f"w{rng.randint(1, 50) if rng.random() < 0.2 else rng.randint(50, min(vocab, 20000))}"
+    return [" ".join(term() for _ in range(rng.randint(1, 3))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,300000")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--workdir", default=None, help="keep corpora/indexes here instead of a temp dir")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    root = Path(args.workdir or tempfile.mkdtemp(prefix="bm25-bench-"))
+    root.mkdir(parents=True, exist_ok=True)
+
+    print(f"{'docs':>9} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'postings/q':>11}")
+    rows = []
+    for size in sizes:
+        corpus = root / f"corpus-{size}.jsonl"
+        vocab = write_corpus(corpus, size) if not corpus.exists() else vocabulary_size(size)
+        t0 = time.perf_counter()
+        index = SearchIndex.build(str(corpus), str(root / f"corpus-{size}.index"))
+        build = time.perf_counter() - t0
+
+        qs = queries(vocab, args.queries)
+        for q in qs[:20]:
+            index.search(q)  # warm the page cache
+        latencies, touched = [], []
+        for q in qs:
+            t0 = time.perf_counter()
+            index.search(q, k=10)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            touched.append(sum((seg.lookup(t) or (0, 0))[1] for seg in index.segments for t in set(q.split())))
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        rows.append((size, p50))
+        print(f"{size:>9} {build:>8.1f} {p50:>8.2f} {p95:>8.2f} {statistics.mean(touched):>11.0f}")
+
+    if len(rows) > 1:
+        (n0, l0), (n1, l1) = rows[0], rows[-1]
+        print(f"\np50 latency ~ docs^{math.log(l1 / l0) / math.log(n1 / n0):.2f} (1.0 = linear scan)")
+    print(f"corpora and indexes in {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Safe expression engine for Tools.calculator.
+
+Expressions are parsed to an AST once, checked against a whitelist of node
+types and math functions, and compiled into a tree of closures that is cached
+by expression string. Evaluation is bounded by a step budget and by a cap on
+the size of integer results. Powers, factorial, comb and perm estimate their
+result size before computing, and round() caps `ndigits`, so `9 ** 10**8`,
+`(9**9999)**9999`, `comb(10**6, 5*10**5)` and `round(5, -10**8)` fail fast
+instead of hanging the agent.
+
+    >>> evaluate("15 * 23 + 47")
+    392
+    >>> evaluate("sqrt(144) + pi")
+    15.141592653589793
+"""
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Callable, Dict, Union
+
+Number = Union[int, float]
+
+# Just under the 4300-digit limit on int -> str, so every result can be printed
+MAX_INT_BITS = 14_000
+MAX_STEPS = 10_000
+MAX_LENGTH = 1_000
+# round(x, -n) computes 10**n; larger n can only round to 0 within MAX_INT_BITS anyway
+MAX_NDIGITS = 4_300
+
+FUNCTIONS: Dict[str, Callable] = {
+    name: value for name, value in math.__dict__.items()
+    if callable(value) and not name.startswith("_")
+}
+FUNCTIONS.update({"abs": abs, "round": round})
+CONSTANTS: Dict[str, float] = {
+    name: value for name, value in math.__dict__.items()
+    if isinstance(value, float)
+}
+
+BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: None,  # guarded, see _power
+}
+UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that are unsupported or exceed the limits"""
+
+
+class _Budget:
+    __slots__ = ("left",)
+
+    def __init__(self, steps: int):
+        self.left = steps
+
+    def tick(self) -> None:
+        self.left -= 1
+        if self.left < 0:
+            raise ExpressionError("evaluation step limit exceeded")
+
+
+def _check_bits(bits: float) -> None:
+    if bits > MAX_INT_BITS:
+        raise ExpressionError(f"result too large (about {bits:.3g} bits, limit {MAX_INT_BITS})")
+
+
+def _checked(value: Number) -> Number:
+    if isinstance(value, int):
+        _check_bits(value.bit_length())
+    return value
+
+
+def _log2_factorial(n: int) -> float:
+    if n.bit_length() > 64:
+        return math.inf
+    return math.lgamma(n + 1) / math.log(2)
+
+
+def _power(base: Number, exponent: Number, modulus: Number = None) -> Number:
+    if (modulus is None and isinstance(base, int) and isinstance(exponent, int)
+            and exponent > 0 and abs(base) > 1):
+        # |base| ** exponent has at least (bit_length - 1) * exponent bits
+        _check_bits((abs(base).bit_length() - 1) * exponent)
+    return pow(base, exponent) if modulus is None else pow(base, exponent, modulus)
+
+
+def _factorial(n: int) -> int:
+    if isinstance(n, int) and n > 0:
+        _check_bits(_log2_factorial(n))
+    return math.factorial(n)
+
+
+def _comb(n: int, k: int) -> int:
+    if isinstance(n, int) and isinstance(k, int) and 0 < k < n:
+        _check_bits(_log2_factorial(n) - _log2_factorial(k) - _log2_factorial(n - k))
+    return math.comb(n, k)
+
+
+def _perm(n: int, k: int = None) -> int:
+    if isinstance(n, int) and (k is None or isinstance(k, int)) and 0 < (n if k is None else k) <= n:
+        _check_bits(_log2_factorial(n) - _log2_factorial(n - (n if k is None else k)))
+    return math.perm(n, k)
+
+
+def _round(number: Number, ndigits: int = None) -> Number:
+    if isinstance(ndigits, int) and abs(ndigits) > MAX_NDIGITS:
+        raise ExpressionError(f"round() ndigits out of range (limit {MAX_NDIGITS})")
+    return _checked(round(number) if ndigits is None else round(number, ndigits))
+
+
+FUNCTIONS.update({"round": _round, "pow": _power, "factorial": _factorial, "comb": _comb, "perm": _perm})
+
+
+def _compile(node: ast.AST) -> Callable[[_Budget], Number]:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda budget: value
+
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        value = CONSTANTS[node.id]
+        return lambda budget: value
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        op, operand = UNARY_OPS[type(node.op)], _compile(node.operand)
+
+        def unary(budget: _Budget) -> Number:
+            budget.tick()
+            return op(operand(budget))
+        return unary
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPS:
+        op = BINARY_OPS[type(node.op)] or _power
+        left, right = _compile(node.left), _compile(node.right)
+
+        def binary(budget: _Budget) -> Number:
+            budget.tick()
+            return _checked(op(left(budget), right(budget)))
+        return binary
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in FUNCTIONS and not node.keywords):
+        function = FUNCTIONS[node.func.id]
+        args = [_compile(arg) for arg in node.args]
+
+        def call(budget: _Budget) -> Number:
+            budget.tick()
+            return _checked(function(*(arg(budget) for arg in args)))
+        return call
+
+    if isinstance(node, ast.Name):
+        raise ExpressionError(f"unknown name '{node.id}'")
+    raise ExpressionError(f"unsupported expression element: {type(node).__name__}")
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> Callable[[_Budget], Number]:
+    """Parse and compile an expression once; the result is cached by string"""
+    if len(expression) > MAX_LENGTH:
+        raise ExpressionError(f"expression longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"invalid syntax: {e.msg}") from None
+    return _compile(tree.body)
+
+
+def evaluate(expression: str, max_steps: int = MAX_STEPS) -> Number:
+    """Evaluate a mathematical expression within the step budget"""
+    return compile_expression(expression)(_Budget(max_steps))
@@ -0,0 +1,167 @@
+"""
+Incremental conversation compaction for the ReAct loop.
+
+react_loop re-sends the whole message list every iteration, and raw tool
+outputs dominate its size. ConversationBudget keeps a running per-message
+token count and, before each reasoning call, compacts the list in place:
+
+1. Tool results older than the most recent `keep_recent_tool_results` are
+   cut down to a short head (their first `truncate_to_chars` characters).
+2. If the prompt is still over `max_prompt_tokens`, the oldest steps after
+   the user's question are collapsed, oldest first, into a single summary
+   message. A step is an assistant message with its tool calls together with
+   their results (so no result is ever left without its call), or any other
+   single message. Each step becomes one line of at most `summary_chars`
+   characters per part. The most recent step is always kept.
+3. If the summary itself is what keeps the prompt over budget, its oldest
+   lines are dropped.
+
+When nothing is left to compact and the prompt is still over budget,
+`over_budget` is set so the caller can report it.
+
+Token counts use tiktoken when it is installed and a chars/4 estimate
+otherwise.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # optional dependency
+    _ENCODING = None
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD = 4
+SUMMARY_HEADER = "Earlier steps (compacted):"
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    tokens = MESSAGE_OVERHEAD + count_tokens(message.get("content"))
+    for call in message.get("tool_calls") or []:
+        tokens += count_tokens(call["function"]["name"]) + count_tokens(call["function"]["arguments"])
+    return tokens
+
+
+def _head(text: Optional[str], limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else f"{text[:limit]}…"
+
+
+class CompactionPolicy(BaseModel):
+    """How aggressively to compact the ReAct conversation"""
+    max_prompt_tokens: int = 3000
+    keep_recent_tool_results: int = 2
+    truncate_to_chars: int = 300
+    summary_chars: int = 120
+
+
+class ConversationBudget:
+    """Running token count over a message list, with in-place compaction"""
+
+    def __init__(self, policy: CompactionPolicy):
+        self.policy = policy
+        self._counts: List[int] = []
+        self._truncated: List[bool] = []
+        self._summary: Optional[int] = None  # index of the summary message
+        self._lines: List[str] = []
+        self._omitted = 0
+        self.over_budget = False
+
+    @property
+    def total(self) -> int:
+        return sum(self._counts)
+
+    def sync(self, messages: List[Dict[str, Any]]) -> int:
+        """Count only messages appended since the last call"""
+        for message in messages[len(self._counts):]:
+            self._counts.append(message_tokens(message))
+            self._truncated.append(False)
+        return self.total
+
+    def _truncate(self, messages: List[Dict[str, Any]], i: int) -> None:
+        limit = self.policy.truncate_to_chars
+        content = messages[i].get("content") or ""
+        messages[i] = {**messages[i], "content": f"{content[:limit]}… [truncated {len(content) - limit} chars]"}
+        self._counts[i] = message_tokens(messages[i])
+        self._truncated[i] = True
+
+    def _steps(self, messages: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """[start, end) of each step after the question and the summary"""
+        start = next((i + 1 for i, m in enumerate(messages) if m.get("role") == "user"), len(messages))
+        if self._summary is not None:
+            start = self._summary + 1
+        steps = []
+        while start < len(messages):
+            end = start + 1
+            if messages[start].get("tool_calls"):
+                while end < len(messages) and messages[end].get("role") == "tool":
+                    end += 1
+            steps.append((start, end))
+            start = end
+        return steps
+
+    def _describe(self, step: List[Dict[str, Any]]) -> str:
+        n = self.policy.summary_chars
+        message = step[0]
+        if not message.get("tool_calls"):
+            return f"{message.get('role')}: {_head(message.get('content'), n)}"
+        results = {m.get("tool_call_id"): m.get("content") for m in step[1:]}
+        parts = [f"assistant: {_head(message['content'], n)}"] if message.get("content") else []
+        for call in message["tool_calls"]:
+            function = call["function"]
+            parts.append(f"{function['name']}({_head(function['arguments'], n)}) -> "
+                         f"{_head(results.get(call['id']), n)}")
+        return "; ".join(parts)
+
+    def _write_summary(self, messages: List[Dict[str, Any]]) -> None:
+        lines = [f"- ({self._omitted} earlier steps omitted)"] if self._omitted else []
+        lines += [f"- {line}" for line in self._lines]
+        messages[self._summary] = {"role": "assistant", "content": "\n".join([SUMMARY_HEADER, *lines])}
+        self._counts[self._summary] = message_tokens(messages[self._summary])
+
+    def _collapse(self, messages: List[Dict[str, Any]], start: int, end: int) -> None:
+        self._lines.append(self._describe(messages[start:end]))
+        if self._summary is None:
+            # The summary takes the place of the first collapsed step
+            self._summary = start
+            messages[start:end] = [{}]
+            self._counts[start:end] = [0]
+            self._truncated[start:end] = [False]
+        else:
+            del messages[start:end], self._counts[start:end], self._truncated[start:end]
+        self._write_summary(messages)
+
+    def compact(self, messages: List[Dict[str, Any]]) -> int:
+        """Compact `messages` in place; returns the number of tokens saved"""
+        before = self.sync(messages)
+        limit = self.policy.max_prompt_tokens
+
+        tool_indexes = [i for i, m in enumerate(messages) if m.get("role") == "tool"]
+        old = tool_indexes[:max(0, len(tool_indexes) - self.policy.keep_recent_tool_results)]
+        for i in old:
+            if not self._truncated[i] and len(messages[i].get("content") or "") > self.policy.truncate_to_chars:
+                self._truncate(messages, i)
+
+        steps = self._steps(messages)
+        while self.total > limit and len(steps) > 1:
+            self._collapse(messages, *steps[0])
+            steps = self._steps(messages)
+
+        while self.total > limit and self._lines:
+            self._lines.pop(0)
+            self._omitted += 1
+            self._write_summary(messages)
+
+        self.over_budget = self.total > limit
+        return before - self.total
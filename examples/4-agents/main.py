@@ -12,16 +12,26 @@ The agent uses proper OpenAI function calling instead of prompt parsing.
 
 import asyncio
 import json
-import math
 import os
-from typing import Dict, List, Any, Optional, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Union
 from enum import Enum
 from pydantic import BaseModel
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from calculator import evaluate
+from compaction import CompactionPolicy, ConversationBudget
+from search_index import default_index
+from tool_cache import SHARED_TOOL_CACHE, ToolCache, cached
+from sandbox import ProcessSandbox, sandboxed
+from scheduler import LLMGate
+from tracing import Tracer, load_spans, summarize
+from openai_client import get_async_client, pool_stats
 
 load_dotenv()
-client = AsyncOpenAI()
 
 class ActionType(Enum):
     """Enum for different action types the agent can take"""
@@ -42,33 +52,46 @@ class ReasoningResult(BaseModel):
     content: Optional[str] = None
     tool_calls: List[ToolCall] = []
     raw_message: Optional[str] = None
+    # Streaming timings (seconds since the request was sent)
+    time_to_first_token: Optional[float] = None
+    time_to_first_tool: Optional[float] = None
+    # Token usage reported by the API for this call
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    error: Optional[str] = None
+    retries: int = 0
+
+class ToolFailure(str):
+    """A tool result reporting a failure; the text is what the model sees"""
 
 class Tools:
     """Available tools for the agent to use via function calling"""
     
     @staticmethod
+    @cached(maxsize=1024, ignore_whitespace=True)
+    @sandboxed
     def calculator(expression: str) -> str:
         """Safely evaluate mathematical expressions"""
         try:
-            # Only allow safe mathematical operations
-            allowed_names = {
-                k: v for k, v in math.__dict__.items() 
-                if not k.startswith("__")
-            }
-            allowed_names.update({"abs": abs, "round": round, "pow": pow})
-            
-            # Basic safety check - remove potentially dangerous characters
-            if any(char in expression for char in ['import', '__', 'exec', 'eval', 'open', 'file']):
-                return "Error: Potentially unsafe expression"
-            
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
+            result = evaluate(expression)
             return f"Calculation result: {result}"
         except Exception as e:
-            return f"Calculation error: {str(e)}"
+            return ToolFailure(f"Calculation error: {str(e)}")
     
     @staticmethod
-    def search(query: str) -> str:
-        """Search for information (mock implementation)"""
+    @cached(maxsize=256, ttl=300, case_sensitive=False)
+    async def search(query: str) -> str:
+        """Search the local BM25 index if one is configured, else the mock results"""
+        # First use builds/refreshes the index, so keep it off the event loop
+        index = await asyncio.get_running_loop().run_in_executor(None, default_index)
+        if index is not None:
+            hits = await index.asearch(query, k=3)
+            if not hits:
+                return f"Search result: No documents found for '{query}'."
+            return "Search result:\n" + "\n".join(
+                f"- [{hit.title or hit.id}] {hit.text[:300]}" for hit in hits
+            )
+        
         mock_results = {
             "python": "Python is a high-level programming language known for its simplicity and readability.",
             "react": "ReAct (Reasoning and Acting) is a paradigm that combines reasoning and acting in language models.",
@@ -88,9 +111,35 @@ class Tools:
 class Agent:
     """ReAct Agent using OpenAI's structured output and function calling"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        tool_timeout: float = 30.0,
+        max_tool_workers: int = 8,
+        stream: bool = False,
+        tool_cache: Optional[ToolCache] = SHARED_TOOL_CACHE,
+        compaction: Optional[CompactionPolicy] = None,
+        tracer: Optional[Tracer] = None,
+        llm_gate: Optional[LLMGate] = None,
+        tool_executor: Optional[ThreadPoolExecutor] = None,
+        verbose: bool = True,
+        sandbox: Optional[ProcessSandbox] = None,
+        client: Optional[AsyncOpenAI] = None,
+    ):
         self.tools = Tools()
+        # None: the pooled client from openai_client for the running event loop
+        self.client = client
+        self.sandbox = sandbox
+        self.tracer = tracer or Tracer()
+        self.llm_gate = llm_gate
+        self.verbose = verbose
+        self.tool_cache = tool_cache
+        self.compaction = compaction
         self.max_iterations = 10
+        # Per-iteration prompt size and latency of the last react_loop run
+        self.iteration_stats: List[Dict[str, Any]] = []
+        self.stream = stream
+        self.tool_timeout = tool_timeout
+        self.tool_executor = tool_executor or ThreadPoolExecutor(max_workers=max_tool_workers, thread_name_prefix="tool")
         
         # Define function schemas for OpenAI function calling
         self.function_definitions = [
@@ -130,6 +179,32 @@ class Agent:
             }
         ]
     
+    def _client(self):
+        client = self.client or get_async_client()
+        # With a gate, 429s must reach it: the SDK's own retries would bypass
+        # the shared backoff and hide them from the gate's stats
+        return client if self.llm_gate is None else client.with_options(max_retries=0)
+
+    async def _create(self, kwargs: Dict[str, Any]):
+        """Send a chat completion, through the shared LLM gate when one is set"""
+        client = self._client()
+        if self.llm_gate is None:
+            return await client.chat.completions.create(**kwargs), 0
+        return await self.llm_gate.run(lambda: client.chat.completions.create(**kwargs))
+
+    @asynccontextmanager
+    async def _stream(self, kwargs: Dict[str, Any]):
+        """Open a streamed chat completion; a gate slot is held until the block exits"""
+        client = self._client()
+        if self.llm_gate is None:
+            stream, retries = await client.chat.completions.create(**kwargs), 0
+            async with stream:
+                yield stream, retries
+            return
+        async with self.llm_gate.hold(lambda: client.chat.completions.create(**kwargs)) as (stream, retries):
+            async with stream:
+                yield stream, retries
+    
     async def reason(self, messages: List[Dict[str, str]], use_functions: bool = True) -> ReasoningResult:
         """
         Core reasoning method - calls OpenAI and determines next action
@@ -152,8 +227,13 @@ class Agent:
                 kwargs["tools"] = self.function_definitions
                 kwargs["tool_choice"] = "auto"
             
-            response = await client.chat.completions.create(**kwargs)
+            response, retries = await self._create(kwargs)
             message = response.choices[0].message
+            usage = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "retries": retries,
+            } if response.usage else {"retries": retries}
             
             # Determine action type based on response
             if message.tool_calls:
@@ -163,21 +243,23 @@ class Agent:
                     tool_calls.append(ToolCall(
                         id=tool_call.id,
                         function_name=tool_call.function.name,
-                        arguments=json.loads(tool_call.function.arguments)
+                        arguments=self._parse_arguments(tool_call.function.name, tool_call.function.arguments)
                     ))
                 
                 return ReasoningResult(
                     action_type=ActionType.TOOL_CALL,
                     content=message.content,
                     tool_calls=tool_calls,
-                    raw_message=message.content
+                    raw_message=message.content,
+                    **usage
                 )
             
             elif message.content:
                 return ReasoningResult(
                     action_type=ActionType.FINAL_ANSWER,
                     content=message.content,
-                    raw_message=message.content
+                    raw_message=message.content,
+                    **usage
                 )
 
             else:
@@ -185,15 +267,151 @@ class Agent:
                 return ReasoningResult(
                     action_type=ActionType.CONTINUE,
                     content="No response from model",
-                    raw_message=""
+                    raw_message="",
+                    **usage
                 )
                 
         except Exception as e:
             return ReasoningResult(
                 action_type=ActionType.CONTINUE,
                 content=f"Error in reason method: {str(e)}",
-                raw_message=""
+                raw_message="",
+                error=str(e)
+            )
+    
+    async def reason_stream(
+        self,
+        messages: List[Dict[str, str]],
+        on_tool_call: Optional[Callable[[ToolCall], None]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        use_functions: bool = True,
+    ) -> ReasoningResult:
+        """
+        Streaming variant of reason - assembles tool_calls deltas as they arrive
+        
+        Args:
+            messages: Conversation messages
+            on_tool_call: Called with each ToolCall as soon as its arguments JSON
+                is complete, while the model is still streaming
+            on_token: Called with each content token as it arrives
+            use_functions: Whether to enable function calling
+            
+        Returns:
+            ReasoningResult with action type, tool calls and streaming timings
+        """
+        kwargs = {
+            "model": "gpt-4o-mini",
+            "messages": messages,
+            "temperature": 0.1,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        
+        if use_functions:
+            kwargs["tools"] = self.function_definitions
+            kwargs["tool_choice"] = "auto"
+        
+        start = time.perf_counter()
+        ttft = first_tool = None
+        content: List[str] = []
+        usage: Dict[str, Any] = {}
+        # index -> {"id", "name", "arguments"} partially assembled from deltas
+        partial_calls: Dict[int, Dict[str, str]] = {}
+        completed: Dict[int, ToolCall] = {}
+        
+        def complete(index: int, final: bool = False) -> None:
+            nonlocal first_tool
+            call = partial_calls[index]
+            raw = call["arguments"] or "{}"
+            if not final and not raw.rstrip().endswith("}"):
+                return
+            try:
+                arguments = self._parse_arguments(call["name"], raw)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                return
+            completed[index] = ToolCall(id=call["id"], function_name=call["name"], arguments=arguments)
+            if first_tool is None:
+                first_tool = time.perf_counter() - start
+            if on_tool_call:
+                on_tool_call(completed[index])
+        
+        try:
+            async with self._stream(kwargs) as (stream, usage["retries"]):
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage.update(
+                            prompt_tokens=chunk.usage.prompt_tokens,
+                            completion_tokens=chunk.usage.completion_tokens,
+                        )
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+
+                    if delta.content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        content.append(delta.content)
+                        if on_token:
+                            on_token(delta.content)
+
+                    for tc in delta.tool_calls or []:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        call = partial_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["arguments"] += tc.function.arguments
+                            if tc.index not in completed:
+                                complete(tc.index)
+
+            # Anything the incremental check did not catch (e.g. empty arguments)
+            for index in sorted(partial_calls):
+                if index not in completed:
+                    complete(index, final=True)
+        
+        except Exception as e:
+            return ReasoningResult(
+                action_type=ActionType.CONTINUE,
+                content=f"Error in reason_stream method: {str(e)}",
+                raw_message="",
+                error=str(e),
+                tool_calls=[completed[i] for i in sorted(completed)],
+                time_to_first_token=ttft,
+                time_to_first_tool=first_tool,
+                **usage
             )
+        
+        text = "".join(content) or None
+        if completed:
+            action_type = ActionType.TOOL_CALL
+        elif text:
+            action_type = ActionType.FINAL_ANSWER
+        else:
+            action_type = ActionType.CONTINUE
+        
+        return ReasoningResult(
+            action_type=action_type,
+            content=text if action_type != ActionType.CONTINUE else "No response from model",
+            tool_calls=[completed[i] for i in sorted(completed)],
+            raw_message=text or "",
+            time_to_first_token=ttft,
+            time_to_first_tool=first_tool,
+            **usage
+        )
+    
+    def _print(self, *args: Any, **kwargs: Any) -> None:
+        if self.verbose:
+            print(*args, **kwargs)
+    
+    def _parse_arguments(self, function_name: str, raw: str) -> Dict[str, Any]:
+        """Decode a tool call's JSON arguments (traced, it is on the hot path)"""
+        with self.tracer.span("parse_arguments", tool=function_name, chars=len(raw)):
+            return json.loads(raw)
     
     def add_tool_calls_to_memory(self, messages: List[Dict[str, Any]], reasoning_result: ReasoningResult) -> None:
         """
@@ -249,18 +467,90 @@ class Agent:
         try:
             if hasattr(self.tools, function_name):
                 function = getattr(self.tools, function_name)
+                policy = getattr(function, "cache_policy", None)
+                if asyncio.iscoroutinefunction(function):
+                    # No loop of our own here (tool thread); act_async awaits these directly
+                    if policy is not None and self.tool_cache is not None:
+                        return asyncio.run(self.tool_cache.acall(function_name, policy, function, arguments))
+                    return asyncio.run(function(**arguments))
+                if policy is not None and self.tool_cache is not None:
+                    return self.tool_cache.call(function_name, policy, function, arguments)
                 return function(**arguments)
             else:
-                return f"Error: Unknown function '{function_name}'"
+                return ToolFailure(f"Error: Unknown function '{function_name}'")
         except Exception as e:
-            return f"Error executing {function_name}: {str(e)}"
+            return ToolFailure(f"Error executing {function_name}: {str(e)}")
+    
+    async def act_async(self, function_name: str, arguments: Dict[str, Any]) -> str:
+        """
+        Non-blocking acting method - async tools are awaited directly, @sandboxed
+        tools run in the process sandbox (if the agent has one) and other sync
+        tools run on the tool thread pool. All are bounded by tool_timeout.
+        
+        Args:
+            function_name: Name of the function to execute
+            arguments: Arguments to pass to the function
+            
+        Returns:
+            String result from the function execution
+        """
+        with self.tracer.span("act", tool=function_name) as span:
+            function = getattr(self.tools, function_name, None)
+            if function is None:
+                span.error = "unknown function"
+                return ToolFailure(f"Error: Unknown function '{function_name}'")
+            
+            try:
+                policy = getattr(function, "cache_policy", None)
+                span.attributes["cacheable"] = policy is not None and self.tool_cache is not None
+                span.attributes["sandboxed"] = self.sandbox is not None and getattr(function, "sandboxed", False)
+                if span.attributes["sandboxed"]:
+                    run = lambda **kwargs: self.sandbox.run(function, kwargs)
+                    if span.attributes["cacheable"]:
+                        call = self.tool_cache.acall(function_name, policy, run, arguments)
+                    else:
+                        call = run(**arguments)
+                elif asyncio.iscoroutinefunction(function):
+                    if span.attributes["cacheable"]:
+                        call = self.tool_cache.acall(function_name, policy, function, arguments)
+                    else:
+                        call = function(**arguments)
+                else:
+                    loop = asyncio.get_running_loop()
+                    call = loop.run_in_executor(self.tool_executor, partial(self.act, function_name, arguments))
+                result = await asyncio.wait_for(call, timeout=self.tool_timeout)
+                if isinstance(result, ToolFailure):
+                    span.error = str(result)
+                return result
+            except asyncio.TimeoutError:
+                # The awaitable is cancelled; a sync tool's thread finishes in the background
+                span.error = "timeout"
+                return ToolFailure(f"Error executing {function_name}: timed out after {self.tool_timeout}s")
+            except Exception as e:
+                span.error = str(e)
+                return ToolFailure(f"Error executing {function_name}: {str(e)}")
+    
+    async def act_all(self, tool_calls: List[ToolCall]) -> Dict[str, str]:
+        """
+        Execute all tool calls from one model turn concurrently
+        
+        Args:
+            tool_calls: Tool calls returned by the reasoning step
+            
+        Returns:
+            Mapping of tool_call_id to result, in the same order as tool_calls
+        """
+        results = await asyncio.gather(
+            *(self.act_async(tc.function_name, tc.arguments) for tc in tool_calls)
+        )
+        return {tc.id: result for tc, result in zip(tool_calls, results)}
     
     async def react_loop(self, user_query: str) -> str:
         """
         Main ReAct loop with clear separation of reasoning and acting
         """
-        print(f"\n🎯 Observe: {user_query}")
-        
+        self._print(f"\n🎯 Observe: {user_query}")
+
         messages = [
             {
                 "role": "system", 
@@ -270,51 +560,110 @@ Think step by step and use tools when needed. When you have enough information t
             },
             {"role": "user", "content": user_query}
         ]
-        
-        for iteration in range(self.max_iterations):
-            print(f"\n--- Iteration {iteration + 1} ---")
-            
-            # REASON: Get next action from the model
-            reasoning_result = await self.reason(messages)
-            print(f"🧠 Reasoning: {reasoning_result.action_type.value}")
-            
-            if reasoning_result.action_type == ActionType.TOOL_CALL:
-                print("🔧 Act:")
-                
-                # Add assistant message with tool calls to memory
-                self.add_tool_calls_to_memory(messages, reasoning_result)
-                
-                # ACT: Execute each tool call
-                for tool_call in reasoning_result.tool_calls:
-                    print(f"  📱 {tool_call.function_name}({tool_call.arguments})")
-                    
-                    # Execute the tool
-                    result = self.act(tool_call.function_name, tool_call.arguments)
-                    print(f"  📋 Result: {result}")
-                    
-                    # Add tool result to memory
-                    self.add_tool_result_to_memory(messages, tool_call.id, result)
-                
-                # Continue the ReAct loop
-                continue
-                
-            elif reasoning_result.action_type == ActionType.FINAL_ANSWER:
-                print(f"✅ Final Answer: {reasoning_result.content}")
-                return reasoning_result.content
-                
-            elif reasoning_result.action_type == ActionType.CONTINUE:
-                print(f"💭 Agent response: {reasoning_result.content}")
-                
-                # Add response and ask for final answer
-                messages.append({"role": "assistant", "content": reasoning_result.content})
-                messages.append({"role": "user", "content": "Please provide your final answer to the original question."})
-                continue
-        
-        return "Maximum iterations reached. Unable to complete the task."
 
-async def demo():
+        budget = ConversationBudget(self.compaction) if self.compaction else None
+        self.iteration_stats = []
+
+        with self.tracer.span("react_loop", query=user_query):
+            for iteration in range(self.max_iterations):
+                self._print(f"\n--- Iteration {iteration + 1} ---")
+                with self.tracer.span("iteration", iteration=iteration + 1):
+                    # Keep the prompt within budget before re-sending it
+                    if budget:
+                        saved = budget.compact(messages)
+                        if saved > 0:
+                            self._print(f"🗜️  Compacted {saved} tokens")
+                        if budget.over_budget:
+                            self._print(f"⚠️  Prompt still over budget: ~{budget.total} > "
+                                        f"{budget.policy.max_prompt_tokens} tokens")
+
+                    # REASON: Get next action from the model
+                    started = time.perf_counter()
+                    with self.tracer.span("reason", model="gpt-4o-mini", stream=self.stream) as span:
+                        if self.stream:
+                            # Tools start as soon as their arguments are complete
+                            pending: Dict[str, asyncio.Task] = {}
+                            reasoning_result = await self.reason_stream(
+                                messages,
+                                on_tool_call=lambda tc: pending.setdefault(
+                                    tc.id, asyncio.create_task(self.act_async(tc.function_name, tc.arguments))
+                                ),
+                                on_token=lambda token: self._print(token, end="", flush=True),
+                            )
+                            if reasoning_result.raw_message:
+                                self._print()
+                            self._print(f"⏱️  TTFT: {_fmt_seconds(reasoning_result.time_to_first_token)}, "
+                                  f"first tool: {_fmt_seconds(reasoning_result.time_to_first_tool)}")
+                            if reasoning_result.action_type != ActionType.TOOL_CALL:
+                                for task in pending.values():
+                                    task.cancel()
+                        else:
+                            reasoning_result = await self.reason(messages)
+                        span.attributes.update(
+                            action=reasoning_result.action_type.value,
+                            tool_calls=len(reasoning_result.tool_calls),
+                            prompt_tokens=reasoning_result.prompt_tokens,
+                            completion_tokens=reasoning_result.completion_tokens,
+                            time_to_first_token=reasoning_result.time_to_first_token,
+                            time_to_first_tool=reasoning_result.time_to_first_tool,
+                            error=reasoning_result.error is not None,
+                            retries=reasoning_result.retries,
+                        )
+                        span.error = reasoning_result.error
+                    self.iteration_stats.append({
+                        "iteration": iteration + 1,
+                        "prompt_tokens": reasoning_result.prompt_tokens,
+                        "estimated_prompt_tokens": budget.total if budget else None,
+                        "over_budget": budget.over_budget if budget else None,
+                        "latency": time.perf_counter() - started,
+                    })
+                    self._print(f"🧠 Reasoning: {reasoning_result.action_type.value} "
+                          f"({reasoning_result.prompt_tokens or '?'} prompt tokens, "
+                          f"{_fmt_seconds(self.iteration_stats[-1]['latency'])})")
+
+                    if reasoning_result.action_type == ActionType.TOOL_CALL:
+                        self._print("🔧 Act:")
+
+                        # Add assistant message with tool calls to memory
+                        self.add_tool_calls_to_memory(messages, reasoning_result)
+
+                        # ACT: Execute the tool calls concurrently
+                        if self.stream:
+                            results = {tc.id: await pending[tc.id] for tc in reasoning_result.tool_calls}
+                        else:
+                            results = await self.act_all(reasoning_result.tool_calls)
+
+                        for tool_call in reasoning_result.tool_calls:
+                            result = results[tool_call.id]
+                            self._print(f"  📱 {tool_call.function_name}({tool_call.arguments})")
+                            self._print(f"  📋 Result: {result}")
+
+                            # Add tool result to memory
+                            self.add_tool_result_to_memory(messages, tool_call.id, result)
+
+                        # Continue the ReAct loop
+                        continue
+
+                    elif reasoning_result.action_type == ActionType.FINAL_ANSWER:
+                        self._print(f"✅ Final Answer: {reasoning_result.content}")
+                        return reasoning_result.content
+
+                    elif reasoning_result.action_type == ActionType.CONTINUE:
+                        self._print(f"💭 Agent response: {reasoning_result.content}")
+
+                        # Add response and ask for final answer
+                        messages.append({"role": "assistant", "content": reasoning_result.content})
+                        messages.append({"role": "user", "content": "Please provide your final answer to the original question."})
+                        continue
+
+            return "Maximum iterations reached. Unable to complete the task."
+
+def _fmt_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.0f}ms"
+
+async def demo(stream: bool = False, sandbox: Optional[ProcessSandbox] = None):
     """Demonstrate the ReAct agent using structured output and function calling"""
-    agent = Agent()
+    agent = Agent(stream=stream, tracer=Tracer.from_env(), sandbox=sandbox)
     
     examples = [
         "What is 15 * 23 + 47?",
@@ -331,10 +680,19 @@ async def demo():
         result = await agent.react_loop(query)
         print(f"\n🎯 FINAL RESULT: {result}")
         print("\n" + "="*70)
+    
+    if agent.tool_cache is not None:
+        print(f"\n🗄️  Tool cache: {agent.tool_cache.stats()}")
+    print(f"🔌 Connection pool: {pool_stats()}")
+    
+    agent.tracer.close()
+    if os.getenv("AGENT_TRACE_FILE"):
+        print(f"\n📊 Trace summary ({os.environ['AGENT_TRACE_FILE']})")
+        print(summarize(load_spans(os.environ["AGENT_TRACE_FILE"])))
 
-async def interactive_demo():
+async def interactive_demo(stream: bool = False, sandbox: Optional[ProcessSandbox] = None):
     """Interactive demo where user can ask questions"""
-    agent = Agent()
+    agent = Agent(stream=stream, tracer=Tracer.from_env(), sandbox=sandbox)
     
     print("🤖 ReAct Agent Interactive Demo")
     print("Using OpenAI function calling and structured output")
@@ -363,7 +721,19 @@ async def interactive_demo():
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == "interactive":
-        asyncio.run(interactive_demo())
-    else:
-        asyncio.run(demo())
+    stream = "--stream" in sys.argv
+    if "--trace" in sys.argv:
+        # Export spans to a JSONL trace file (default: trace.jsonl)
+        i = sys.argv.index("--trace")
+        path = sys.argv[i + 1] if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith("--") else "trace.jsonl"
+        os.environ["AGENT_TRACE_FILE"] = path
+    # Run calculator in warm worker processes with time/memory limits
+    sandbox = ProcessSandbox(timeout=5.0, memory_mb=512, preload=["calculator"]) if "--sandbox" in sys.argv else None
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "interactive":
+            asyncio.run(interactive_demo(stream=stream, sandbox=sandbox))
+        else:
+            asyncio.run(demo(stream=stream, sandbox=sandbox))
+    finally:
+        if sandbox:
+            sandbox.close()
@@ -0,0 +1,175 @@
+"""
+Process-pool sandbox for CPU-heavy or untrusted tools.
+
+Tools marked with @sandboxed run in a pool of pre-started worker processes
+instead of the agent's thread pool, so `factorial(100000)` burns another core
+instead of holding the GIL for every concurrent session.
+
+- Workers are started, and optionally pre-import modules, before the first
+  call, so dispatch costs one pipe round trip. They come from a forkserver
+  (or spawn), never from forking the multi-threaded agent process.
+- Each call has a wall-clock timeout. A worker that overruns is killed and
+  replaced, and a cancelled call kills its worker in the same way.
+- Each worker runs under an address-space limit (RLIMIT_AS, POSIX only) and
+  is recycled after a MemoryError or after `max_tasks_per_worker` calls.
+
+    sandbox = ProcessSandbox(workers=4, timeout=5.0, memory_mb=512)
+    await sandbox.start()
+    result = await sandbox.run(Tools.calculator, {"expression": "factorial(5000)"})
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class SandboxError(RuntimeError):
+    """Raised when a sandboxed call times out, runs out of memory or its worker dies"""
+
+
+def sandboxed(fn: Callable) -> Callable:
+    """Mark a tool to run in the ProcessSandbox when the Agent has one"""
+    fn.sandboxed = True
+    return fn
+
+
+def _worker_main(conn, memory_bytes: Optional[int], preload: Sequence[str]) -> None:
+    if memory_bytes and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    for module in preload:
+        importlib.import_module(module)
+    while True:
+        try:
+            fn, kwargs = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", fn(**kwargs)))
+        except MemoryError:
+            conn.send(("memory", "memory limit exceeded"))
+            return
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_bytes: Optional[int], preload: Sequence[str]):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, memory_bytes, tuple(preload)), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class ProcessSandbox:
+    """Pool of warm worker processes with per-call time and memory limits"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: float = 10.0,
+        memory_mb: Optional[int] = 512,
+        max_tasks_per_worker: int = 1000,
+        preload: Sequence[str] = (),
+        start_method: Optional[str] = None,
+    ):
+        self.size = workers or os.cpu_count() or 2
+        self.timeout = timeout
+        self.memory_bytes = memory_mb * 1024 * 1024 if memory_mb else None
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.preload = list(preload)
+        # Workers are started from executor threads while the agent's tool pool
+        # and HTTP clients are running, and a child forked from a multi-threaded
+        # process can block forever on a lock some other thread held. So workers
+        # come from the single-threaded forkserver (spawn where there is none)
+        # rather than from fork; list the modules that define sandboxed tools in
+        # `preload` so workers import them while warming.
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self.stats = {"calls": 0, "timeouts": 0, "errors": 0, "recycled": 0}
+
+    async def start(self) -> None:
+        """Start (warm) all workers ahead of the first call"""
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        workers = await asyncio.gather(*(loop.run_in_executor(None, self._spawn) for _ in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.memory_bytes, self.preload)
+        self._workers.append(worker)
+        return worker
+
+    async def _replace(self, worker: _Worker) -> None:
+        self.stats["recycled"] += 1
+        self._workers.remove(worker)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, worker.kill)
+        self._idle.put_nowait(await loop.run_in_executor(None, self._spawn))
+
+    async def _receive(self, worker: _Worker):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def run(self, fn: Callable[..., Any], kwargs: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Run fn(**kwargs) in a worker process; fn must be importable (picklable by reference)"""
+        await self.start()
+        worker = await self._idle.get()
+        self.stats["calls"] += 1
+        recycle = True
+        try:
+            worker.conn.send((fn, kwargs))
+            status, value = await asyncio.wait_for(self._receive(worker), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise SandboxError(f"timed out after {timeout or self.timeout}s") from None
+        except (EOFError, OSError) as e:
+            self.stats["errors"] += 1
+            raise SandboxError(f"worker died: {e}") from None
+        else:
+            worker.tasks += 1
+            if status == "memory":
+                raise SandboxError(value)
+            recycle = worker.tasks >= self.max_tasks_per_worker
+            if status == "error":
+                self.stats["errors"] += 1
+                raise SandboxError(value)
+            return value
+        finally:
+            # Cancelled or timed-out calls leave the worker busy: kill and replace it
+            if recycle:
+                asyncio.ensure_future(self._replace(worker))
+            else:
+                self._idle.put_nowait(worker)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
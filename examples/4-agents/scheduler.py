@@ -0,0 +1,183 @@
+"""
+Run many independent react_loop sessions concurrently.
+
+- LLMGate caps in-flight LLM calls across all sessions. Waiters are served
+  first-in first-out, so a session that has just finished a call queues
+  behind the others: one long session cannot starve the rest. On a 429 the
+  gate pauses every caller until the backoff (Retry-After, else exponential)
+  has passed, so the fleet backs off together instead of hammering the API.
+  Streams keep their slot (LLMGate.hold) until they have been read to the
+  end, so the cap applies to running generations, not just to request starts.
+  Callers send requests with the client's own retries off, so every 429
+  reaches the gate.
+- AgentScheduler gives each session its own Agent (isolated messages and
+  stats). All Agents share the gate, tool cache, tracer and tool thread pool.
+  The number of active sessions is capped by max_sessions.
+
+    scheduler = AgentScheduler(max_sessions=16, gate=LLMGate(max_concurrency=8))
+    results = await scheduler.run(queries)
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import openai
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class LLMGate:
+    """Fair global concurrency limit with shared rate-limit backoff"""
+
+    def __init__(self, max_concurrency: int = 8, max_retries: int = 6, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._resume_at = 0.0
+        self.stats = {"calls": 0, "rate_limited": 0, "waited": 0.0}
+
+    async def _acquire(self) -> None:
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter  # slot handed over by _release
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        # Honour a fleet-wide rate-limit pause before sending anything
+        pause = self._resume_at - time.monotonic()
+        if pause > 0:
+            self.stats["waited"] += pause
+            try:
+                await asyncio.sleep(pause)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot to the longest waiter
+                return
+        self._in_flight -= 1
+
+    def _backoff(self, error: openai.RateLimitError, attempt: int) -> None:
+        delay = None
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            delay = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random() / 2)
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    @asynccontextmanager
+    async def hold(self, make_call: Callable[[], Awaitable[T]]) -> AsyncIterator[Tuple[T, int]]:
+        """Make an LLM call through the gate and keep its slot until the block exits
+
+        Use this for streams: the slot is released once the response has been
+        read, not when the request starts. Yields (result, retries).
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire()
+            try:
+                self.stats["calls"] += 1
+                try:
+                    result = await make_call()
+                except openai.RateLimitError as e:
+                    self.stats["rate_limited"] += 1
+                    if attempt == self.max_retries:
+                        raise
+                    self._backoff(e, attempt)
+                    continue
+                yield result, attempt
+                return
+            finally:
+                self._release()
+
+    async def run(self, make_call: Callable[[], Awaitable[T]]) -> Tuple[T, int]:
+        """Run an LLM call through the gate; returns (result, retries)"""
+        async with self.hold(make_call) as (result, retries):
+            return result, retries
+
+
+class SessionResult(BaseModel):
+    """Outcome of one scheduled react_loop session"""
+    session: int
+    query: str
+    answer: Optional[str] = None
+    error: Optional[str] = None
+    queued: float          # seconds spent waiting for a session slot
+    latency: float         # end-to-end seconds, including queueing
+    iterations: int = 0
+
+
+class AgentScheduler:
+    """Runs independent react_loop sessions with bounded concurrency"""
+
+    def __init__(
+        self,
+        max_sessions: int = 16,
+        gate: Optional[LLMGate] = None,
+        agent_kwargs: Optional[Dict[str, Any]] = None,
+        max_tool_workers: int = 16,
+    ):
+        self.max_sessions = max_sessions
+        self.gate = gate or LLMGate()
+        self.agent_kwargs = agent_kwargs or {}
+        self.tool_executor = ThreadPoolExecutor(max_workers=max_tool_workers, thread_name_prefix="tool")
+
+    def _new_agent(self):
+        from main import Agent  # main imports LLMGate from here
+
+        return Agent(
+            llm_gate=self.gate,
+            tool_executor=self.tool_executor,
+            verbose=False,
+            **self.agent_kwargs,
+        )
+
+    async def run(self, queries: Iterable[str]) -> List[SessionResult]:
+        """Run every query as its own session; results are in input order"""
+        slots = asyncio.Semaphore(self.max_sessions)
+
+        async def session(i: int, query: str) -> SessionResult:
+            submitted = time.perf_counter()
+            async with slots:
+                started = time.perf_counter()
+                agent = self._new_agent()
+                try:
+                    answer, error = await agent.react_loop(query), None
+                except Exception as e:
+                    answer, error = None, f"{type(e).__name__}: {e}"
+                return SessionResult(
+                    session=i,
+                    query=query,
+                    answer=answer,
+                    error=error,
+                    queued=started - submitted,
+                    latency=time.perf_counter() - submitted,
+                    iterations=len(agent.iteration_stats),
+                )
+
+        return await asyncio.gather(*(session(i, q) for i, q in enumerate(queries)))
+
+    def close(self) -> None:
+        self.tool_executor.shutdown(wait=False)
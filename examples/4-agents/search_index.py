@@ -0,0 +1,358 @@
+"""
+Local BM25 search backend for Tools.search.
+
+A corpus is either a JSONL file (one {"id", "title", "text"} object per line)
+or a directory of documents (*.txt / *.md files, one document each, plus any
+*.jsonl files). It is indexed into immutable on-disk segments:
+
+    manifest.json          sources -> (segment, doc range), segment stats
+    seg-NNNNNN.lexicon     sorted UTF-8 terms, concatenated
+    seg-NNNNNN.terms       uint64 (lexicon offset, postings offset, doc frequency) per term
+    seg-NNNNNN.postings    uint32 (doc, tf) pairs, grouped by term
+    seg-NNNNNN.doclens     uint32 document lengths
+    seg-NNNNNN.offsets     uint64 byte offsets into .docs
+    seg-NNNNNN.docs        stored documents, one JSON record per line
+
+Builds are incremental: unchanged sources are skipped, JSONL files that only
+grew have just the appended bytes indexed, and changed or removed sources are
+tombstoned in the manifest. All segment files except .docs are memory-mapped
+at load time and terms are found by binary search over the sorted term table,
+so opening a segment costs nothing per term and a query only pages in the
+lexicon entries and postings it touches.
+
+    index = SearchIndex.build("corpus.jsonl", "corpus.index")
+    hits = await index.asearch("python programming", k=3)
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were will with".split()
+)
+DOC_SUFFIXES = {".txt", ".md"}
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 2
+SEGMENT_FILES = ("lexicon", "terms", "postings", "doclens", "offsets", "docs")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class SearchHit(BaseModel):
+    """A ranked search result"""
+    id: str
+    title: Optional[str] = None
+    text: str
+    score: float
+    source: str
+
+
+# ---------------------------------------------------------------------------
+# Corpus reading
+# ---------------------------------------------------------------------------
+
+def _iter_jsonl(path: Path, start: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield (record, end_offset) for each complete line from byte `start`"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # partial trailing line; picked up by the next build
+            offset += len(line)
+            if line.strip():
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"text": record}
+                yield record, offset
+
+
+def _tail_hash(path: Path, end: int, size: int = 4096) -> str:
+    with open(path, "rb") as f:
+        f.seek(max(0, end - size))
+        return hashlib.sha1(f.read(end - max(0, end - size))).hexdigest()
+
+
+def _sources(corpus: Path) -> List[Path]:
+    if corpus.is_file():
+        return [corpus]
+    return sorted(
+        p for p in corpus.rglob("*")
+        if p.is_file() and (p.suffix in DOC_SUFFIXES or p.suffix == ".jsonl")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Segments
+# ---------------------------------------------------------------------------
+
+class _SegmentWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.doclens = array("I")
+        self.offsets = array("Q", [0])
+        self.docs = open(f"{path}.docs", "wb")
+        self.total_len = 0
+
+    def add(self, record: Dict[str, Any], source: str) -> int:
+        doc = len(self.doclens)
+        title = record.get("title")
+        text = str(record.get("text", ""))
+        tokens = tokenize(f"{title or ''} {text}")
+        for term, tf in Counter(tokens).items():
+            self.postings[term].extend((doc, tf))
+        self.doclens.append(len(tokens))
+        self.total_len += len(tokens)
+        stored = {"id": str(record.get("id", f"{source}#{doc}")), "title": title, "text": text, "source": source}
+        line = json.dumps(stored, ensure_ascii=False).encode() + b"\n"
+        self.docs.write(line)
+        self.offsets.append(self.offsets[-1] + len(line))
+        return doc
+
+    def __len__(self) -> int:
+        return len(self.doclens)
+
+    def close(self) -> Dict[str, Any]:
+        self.docs.close()
+        # Code point order is UTF-8 byte order, so the lexicon can be searched as bytes
+        lexicon, terms, flat = bytearray(), array("Q"), array("I")
+        for term in sorted(self.postings):
+            pairs = self.postings[term]
+            terms.extend((len(lexicon), len(flat) // 2, len(pairs) // 2))
+            lexicon += term.encode()
+            flat.extend(pairs)
+        with open(f"{self.path}.postings", "wb") as f:
+            flat.tofile(f)
+        with open(f"{self.path}.doclens", "wb") as f:
+            self.doclens.tofile(f)
+        with open(f"{self.path}.offsets", "wb") as f:
+            self.offsets.tofile(f)
+        with open(f"{self.path}.lexicon", "wb") as f:
+            f.write(lexicon)
+        with open(f"{self.path}.terms", "wb") as f:
+            terms.tofile(f)
+        return {"docs": len(self.doclens), "total_len": self.total_len, "deleted": []}
+
+
+def _map(path: str, fmt: str) -> Tuple[Optional[mmap.mmap], memoryview]:
+    if os.path.getsize(path) == 0:
+        return None, memoryview(array(fmt))
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mm, memoryview(mm).cast(fmt)
+
+
+class _Segment:
+    def __init__(self, path: Path, meta: Dict[str, Any]):
+        self._maps = []
+        for name, fmt in (("lexicon", "B"), ("terms", "Q"), ("postings", "I"), ("doclens", "I"),
+                          ("offsets", "Q"), ("docs", "B")):
+            mm, view = _map(f"{path}.{name}", fmt)
+            self._maps.append(mm)
+            setattr(self, name, view)
+        self.docs_raw = self._maps[-1]
+        self.num_terms = len(self.terms) // 3
+        self.deleted = bytearray(meta["docs"])
+        for start, end in meta["deleted"]:
+            self.deleted[start:end] = b"\x01" * (end - start)
+        self.live = meta["docs"] - sum(self.deleted)
+
+    def _term(self, i: int) -> bytes:
+        end = self.terms[3 * i + 3] if i + 1 < self.num_terms else len(self.lexicon)
+        return bytes(self.lexicon[self.terms[3 * i]:end])
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int]]:
+        """(postings offset, document frequency) of `term`, or None if absent"""
+        key = term.encode()
+        lo, hi = 0, self.num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_terms and self._term(lo) == key:
+            return self.terms[3 * lo + 1], self.terms[3 * lo + 2]
+        return None
+
+    def document(self, doc: int) -> Dict[str, Any]:
+        return json.loads(self.docs_raw[self.offsets[doc]:self.offsets[doc + 1]])
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class SearchIndex:
+    """BM25 index over memory-mapped segments"""
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        self.index_dir = Path(index_dir)
+        self.k1, self.b = k1, b
+        with open(self.index_dir / MANIFEST) as f:
+            self.manifest = json.load(f)
+        self.segments = [
+            _Segment(self.index_dir / name, meta)
+            for name, meta in sorted(self.manifest["segments"].items())
+        ]
+        self.num_docs = sum(seg.live for seg in self.segments)
+        total_len = sum(meta["total_len"] for meta in self.manifest["segments"].values())
+        self.avgdl = total_len / max(1, sum(meta["docs"] for meta in self.manifest["segments"].values()))
+
+    @classmethod
+    def build(cls, corpus: str, index_dir: str, segment_size: int = 200_000, rebuild: bool = False) -> "SearchIndex":
+        """Incrementally (re)index `corpus` into `index_dir` and load the result"""
+        corpus_path, out = Path(corpus), Path(index_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        manifest_path = out / MANIFEST
+        manifest = {"version": MANIFEST_VERSION, "corpus": str(corpus_path.resolve()), "next": 0, "segments": {}, "sources": {}}
+        if manifest_path.exists() and not rebuild:
+            with open(manifest_path) as f:
+                previous = json.load(f)
+            if previous.get("corpus") == manifest["corpus"] and previous.get("version") == MANIFEST_VERSION:
+                manifest = previous
+            else:  # another corpus or an older segment format: start over
+                for name in previous.get("segments", {}):
+                    for suffix in ("terms.json", *SEGMENT_FILES):
+                        (out / f"{name}.{suffix}").unlink(missing_ok=True)
+
+        segments, sources = manifest["segments"], manifest["sources"]
+        writer: Optional[_SegmentWriter] = None
+
+        def tombstone(entry: Dict[str, Any]) -> None:
+            for name, start, end in entry["ranges"]:
+                if name in segments:
+                    segments[name]["deleted"].append([start, end])
+
+        def add(record: Dict[str, Any], source: str, entry: Dict[str, Any]) -> None:
+            nonlocal writer
+            if writer is None or len(writer) >= segment_size:
+                flush()
+                name = f"seg-{manifest['next']:06d}"
+                manifest["next"] += 1
+                writer = _SegmentWriter(out / name)
+            doc = writer.add(record, source)
+            name = writer.path.name
+            if entry["ranges"] and entry["ranges"][-1][0] == name and entry["ranges"][-1][2] == doc:
+                entry["ranges"][-1][2] = doc + 1
+            else:
+                entry["ranges"].append([name, doc, doc + 1])
+
+        def flush() -> None:
+            nonlocal writer
+            if writer is not None:
+                segments[writer.path.name] = writer.close()
+                writer = None
+
+        seen = set()
+        for path in _sources(corpus_path):
+            key = str(path.relative_to(corpus_path)) if corpus_path.is_dir() else path.name
+            seen.add(key)
+            stat = path.stat()
+            old = sources.get(key)
+            if old and old["mtime_ns"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+                continue
+
+            start = 0
+            if (old and path.suffix == ".jsonl" and stat.st_size > old["indexed"]
+                    and _tail_hash(path, old["indexed"]) == old["tail"]):
+                start = old["indexed"]  # append-only growth: index just the new lines
+                entry = old
+            else:
+                if old:
+                    tombstone(old)
+                entry = {"ranges": [], "indexed": 0}
+
+            if path.suffix == ".jsonl":
+                for record, end in _iter_jsonl(path, start):
+                    add(record, key, entry)
+                    entry["indexed"] = end
+            else:
+                add({"id": key, "title": path.stem, "text": path.read_text(errors="replace")}, key, entry)
+                entry["indexed"] = stat.st_size
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, tail=_tail_hash(path, entry["indexed"]))
+            sources[key] = entry
+        flush()
+
+        for key in set(sources) - seen:
+            tombstone(sources.pop(key))
+
+        # Drop segments whose every document has been tombstoned
+        for name, meta in list(segments.items()):
+            if sum(end - start for start, end in meta["deleted"]) >= meta["docs"]:
+                del segments[name]
+                for suffix in SEGMENT_FILES:
+                    (out / f"{name}.{suffix}").unlink(missing_ok=True)
+
+        tmp = out / f"{MANIFEST}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, manifest_path)
+        return cls(index_dir)
+
+    def search(self, query: str, k: int = 5) -> List[SearchHit]:
+        """Rank documents for `query` with BM25 and return the top `k`"""
+        k1, b, avgdl = self.k1, self.b, self.avgdl or 1.0
+        scores: Dict[Tuple[int, int], float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            entries = [(i, entry) for i, seg in enumerate(self.segments) if (entry := seg.lookup(term))]
+            df = sum(entry[1] for _, entry in entries)
+            if not df:
+                continue
+            idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            for i, (offset, count) in entries:
+                seg = self.segments[i]
+                postings, doclens, deleted = seg.postings, seg.doclens, seg.deleted
+                for j in range(2 * offset, 2 * (offset + count), 2):
+                    doc, tf = postings[j], postings[j + 1]
+                    if deleted[doc]:
+                        continue
+                    norm = k1 * (1 - b + b * doclens[doc] / avgdl)
+                    scores[(i, doc)] += idf * tf * (k1 + 1) / (tf + norm)
+
+        hits = []
+        for (i, doc), score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+            hits.append(SearchHit(score=score, **self.segments[i].document(doc)))
+        return hits
+
+    async def asearch(self, query: str, k: int = 5) -> List[SearchHit]:
+        """Async interface; the scoring loop runs off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.search, query, k)
+
+
+_default_lock = threading.Lock()
+
+
+def default_index() -> Optional[SearchIndex]:
+    """Index for $AGENT_SEARCH_CORPUS (stored in $AGENT_SEARCH_INDEX), if configured"""
+    with _default_lock:
+        return _load_default_index()
+
+
+@lru_cache(maxsize=None)
+def _load_default_index() -> Optional[SearchIndex]:
+    corpus = os.getenv("AGENT_SEARCH_CORPUS")
+    if not corpus:
+        return None
+    index_dir = os.getenv("AGENT_SEARCH_INDEX") or f"{corpus.rstrip('/')}.index"
+    return SearchIndex.build(corpus, index_dir)
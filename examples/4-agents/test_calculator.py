@@ -0,0 +1,40 @@
+"""
+Limits of the calculator engine: oversized work must fail fast.
+
+    python -m unittest test_calculator
+"""
+import time
+import unittest
+
+from calculator import ExpressionError, evaluate
+
+FAST_S = 0.5
+
+
+class FailFastTest(unittest.TestCase):
+    def assertRejectedQuickly(self, expression: str) -> None:
+        started = time.perf_counter()
+        with self.assertRaises(ExpressionError):
+            evaluate(expression)
+        self.assertLess(time.perf_counter() - started, FAST_S, expression)
+
+    def test_round_huge_negative_ndigits(self):
+        self.assertRejectedQuickly("round(5, -10**8)")
+        self.assertRejectedQuickly("round(5, -10**7)")
+
+    def test_round_huge_positive_ndigits(self):
+        self.assertRejectedQuickly("round(2.5, 10**8)")
+
+    def test_round_in_range(self):
+        self.assertEqual(evaluate("round(2.5)"), 2)
+        self.assertEqual(evaluate("round(3.14159, 2)"), 3.14)
+        self.assertEqual(evaluate("round(12345, -2)"), 12300)
+        self.assertEqual(evaluate("round(10**4000, -4300)"), 0)
+
+    def test_big_int_payloads(self):
+        for expression in ("9 ** 10**8", "(9**9999)**9999", "comb(10**6, 5*10**5)", "factorial(10**6)"):
+            self.assertRejectedQuickly(expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Memoization for deterministic agent tools.
+
+Tools opt in declaratively with the @cached decorator, which attaches a
+CachePolicy to the function. Agent.act looks the policy up and routes the call
+through a ToolCache. SHARED_TOOL_CACHE is the process-wide default, so repeated
+calls from any Agent instance are served from memory.
+
+    class Tools:
+        @staticmethod
+        @cached(maxsize=1024, ignore_whitespace=True)
+        def calculator(expression: str) -> str: ...
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class CachePolicy(BaseModel):
+    """Per-tool caching policy"""
+    maxsize: int = 256
+    ttl: Optional[float] = None          # seconds; None = never expires
+    case_sensitive: bool = True          # lower-case string arguments when False
+    ignore_whitespace: bool = False      # drop all whitespace from string arguments
+
+    def key(self, arguments: Dict[str, Any]) -> str:
+        """Build a cache key from normalized arguments"""
+        def normalize(value: Any) -> Any:
+            if isinstance(value, str):
+                value = value.strip()
+                value = re.sub(r"\s+", "" if self.ignore_whitespace else " ", value)
+                return value if self.case_sensitive else value.lower()
+            if isinstance(value, dict):
+                return {k: normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+
+        return json.dumps(normalize(arguments), sort_keys=True, default=str)
+
+
+def cached(**policy: Any) -> Callable:
+    """Mark a tool as cacheable with the given CachePolicy fields"""
+    def decorator(fn: Callable) -> Callable:
+        fn.cache_policy = CachePolicy(**policy)
+        return fn
+    return decorator
+
+
+class ToolCache:
+    """Thread-safe LRU + TTL cache with one partition per tool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _lookup(self, tool: str, policy: CachePolicy, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entries = self._entries.setdefault(tool, OrderedDict())
+            counters = self._counters.setdefault(tool, {"hits": 0, "misses": 0})
+            if key in entries:
+                stored_at, value = entries[key]
+                if policy.ttl is None or time.monotonic() - stored_at < policy.ttl:
+                    entries.move_to_end(key)
+                    counters["hits"] += 1
+                    return True, value
+                del entries[key]
+            counters["misses"] += 1
+            return False, None
+
+    def _store(self, tool: str, policy: CachePolicy, key: str, value: Any) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(tool, OrderedDict())
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > policy.maxsize:
+                entries.popitem(last=False)
+
+    def call(self, tool: str, policy: CachePolicy, function: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+        """Return the cached result for a sync tool, computing it on a miss"""
+        key = policy.key(arguments)
+        hit, value = self._lookup(tool, policy, key)
+        if hit:
+            return value
+        value = function(**arguments)
+        self._store(tool, policy, key, value)
+        return value
+
+    async def acall(self, tool: str, policy: CachePolicy, function: Callable[..., Awaitable[Any]], arguments: Dict[str, Any]) -> Any:
+        """Return the cached result for an async tool, awaiting it on a miss"""
+        key = policy.key(arguments)
+        hit, value = self._lookup(tool, policy, key)
+        if hit:
+            return value
+        value = await function(**arguments)
+        self._store(tool, policy, key, value)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and current size per tool"""
+        with self._lock:
+            return {
+                tool: {**counters, "size": len(self._entries.get(tool, ()))}
+                for tool, counters in self._counters.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+# Process-wide cache shared by every Agent unless one is given explicitly
+SHARED_TOOL_CACHE = ToolCache()
@@ -0,0 +1,187 @@
+"""
+Lightweight span tracing for the ReAct agent.
+
+    tracer = Tracer(exporters=[JSONLExporter("trace.jsonl")])
+    with tracer.span("reason", model="gpt-4o-mini") as span:
+        ...
+        span.attributes["prompt_tokens"] = 123
+
+Spans nest through a context variable, so asyncio tasks started inside a span
+(e.g. concurrent tool calls) become its children. Finished spans go to the
+exporters: JSONLExporter writes one JSON object per line, and OTelExporter
+mirrors them to OpenTelemetry when `opentelemetry-sdk` is installed.
+
+Summarise a trace file with:
+
+    python tracing.py trace.jsonl
+"""
+
+import contextvars
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span(BaseModel):
+    """A timed phase of the agent"""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    start: float                       # epoch seconds
+    duration: Optional[float] = None   # seconds
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class JSONLExporter:
+    """Append finished spans to a JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        line = span.model_dump_json()
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class OTelExporter:
+    """Mirror spans to the globally configured OpenTelemetry tracer provider"""
+
+    def __init__(self, service_name: str = "react-agent"):
+        from opentelemetry import trace  # optional dependency
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(service_name)
+        self._live: Dict[str, Any] = {}
+
+    def on_start(self, span: Span) -> None:
+        parent = self._live.get(span.parent_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._live[span.span_id] = self._tracer.start_span(
+            span.name, context=context, start_time=int(span.start * 1e9)
+        )
+
+    def on_end(self, span: Span) -> None:
+        otel_span = self._live.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
+        if span.error:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int((span.start + span.duration) * 1e9))
+
+    def close(self) -> None:
+        pass
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters"""
+
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters = exporters or []
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """JSONL export to $AGENT_TRACE_FILE, OpenTelemetry if $AGENT_TRACE_OTEL is set"""
+        exporters: List[Any] = []
+        if os.getenv("AGENT_TRACE_FILE"):
+            exporters.append(JSONLExporter(os.environ["AGENT_TRACE_FILE"]))
+        if os.getenv("AGENT_TRACE_OTEL"):
+            exporters.append(OTelExporter())
+        return cls(exporters)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            start=time.time(),
+            attributes=attributes,
+        )
+        for exporter in self.exporters:
+            exporter.on_start(span)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = span.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            for exporter in self.exporters:
+                exporter.on_end(span)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def load_spans(path: str) -> List[Span]:
+    with open(path) as f:
+        return [Span.model_validate_json(line) for line in f if line.strip()]
+
+
+def summarize(spans: List[Span], top: int = 5) -> str:
+    """Per-phase totals, the slowest individual spans, and model vs tool time"""
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    for span in spans:
+        by_name[span.name].append(span.duration or 0.0)
+        errors[span.name] += span.error is not None or bool(span.attributes.get("error"))
+
+    lines = [f"{'phase':<18} {'count':>6} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'errors':>7}"]
+    for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+        p95 = statistics.quantiles(durations, n=20, method="inclusive")[-1] if len(durations) > 1 else durations[0]
+        lines.append(
+            f"{name:<18} {len(durations):>6} {sum(durations):>9.2f} {statistics.mean(durations) * 1000:>9.1f} "
+            f"{p95 * 1000:>9.1f} {max(durations) * 1000:>9.1f} {errors[name]:>7}"
+        )
+
+    lines.append("\nSlowest spans")
+    for span in sorted(spans, key=lambda s: -(s.duration or 0))[:top]:
+        detail = {k: v for k, v in span.attributes.items() if v is not None}
+        lines.append(f"  {(span.duration or 0) * 1000:>9.1f} ms  {span.name:<16} {detail}")
+
+    model = sum(by_name.get("reason", []))
+    tools = sum(by_name.get("act", []))
+    if model + tools:
+        lines.append(f"\nModel vs tools: {model:.2f}s ({model / (model + tools):.0%}) vs {tools:.2f}s "
+                     f"({tools / (model + tools):.0%}) - tool time overlaps when calls run concurrently")
+    prompt = sum(s.attributes.get("prompt_tokens") or 0 for s in spans if s.name == "reason")
+    completion = sum(s.attributes.get("completion_tokens") or 0 for s in spans if s.name == "reason")
+    lines.append(f"Tokens: {prompt} prompt, {completion} completion")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python tracing.py TRACE.jsonl")
+        sys.exit(1)
+    print(summarize(load_spans(sys.argv[1])))
@@ -0,0 +1,348 @@
+"""
+Throughput benchmark: vLLM vs Hugging Face `generate` on the same chat-templated prompts.
+
+    uv run python bench.py --model HuggingFaceTB/SmolLM2-135M-Instruct \
+        --batch-sizes 1,8,32 --prompt-tokens 64,512 --max-tokens 32,128 --out results/cpu
+
+Every backend runs in its own subprocess, so models and KV caches never compete
+for memory and the memory peaks belong to one backend. For every
+(batch size, prompt length, max_tokens) point the benchmark records:
+
+- tokens_per_s: generated tokens divided by the batch's wall time
+- ttft_s: wall time of the same batch with max_tokens=1 (prefill plus the first token)
+- latency_*: per-request latency. vLLM's request metrics are used when the engine
+  reports them; otherwise each request gets the batch wall time
+- peak_rss_mb: high-water RSS of the backend's process tree, sampled
+- peak_gpu_mb: device-wide memory in use, on CUDA only
+
+All backends decode greedily and ignore EOS, so every request generates exactly
+max_tokens. `hf` pads the whole batch to its longest prompt, while `hf-bucketed` uses the
+length-bucketed batcher from hf_batching.py. Add --length-spread to give
+prompts mixed lengths. Results are written to <out>.csv and <out>.json.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+DEFAULT_MODEL = os.getenv("VLLM_MODEL", "HuggingFaceTB/SmolLM2-135M-Instruct")
+SYSTEM = "You are a concise assistant."
+FILLER = (
+    "The committee reviewed the quarterly throughput numbers for the inference cluster "
+    "and asked for a short summary of the batching experiments before Friday. "
+)
+
+# (wall seconds, generated tokens, per-request latencies)
+GenerateFn = Callable[[List[List[int]], int], Tuple[float, int, List[float]]]
+
+
+class PeakMemory:
+    """Samples RSS of this process and its children (and CUDA memory in use) in a background thread"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.peak_gpu_mb: Optional[float] = None
+        self._stop = threading.Event()
+
+    def _sample(self) -> None:
+        import psutil
+
+        root = psutil.Process()
+        rss = root.memory_info().rss
+        for child in root.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_rss_mb = max(self.peak_rss_mb, rss / 2 ** 20)
+        if self._cuda is not None:
+            free, total = self._cuda.mem_get_info()
+            self.peak_gpu_mb = max(self.peak_gpu_mb or 0.0, (total - free) / 2 ** 20)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemory":
+        import torch
+
+        self._cuda = torch.cuda if torch.cuda.is_available() else None
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def chat_ids(tokenizer, user: str) -> List[int]:
+    messages = [{"role": "system", "content": SYSTEM}, {"role": "user", "content": user}]
+    return tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True, return_dict=False)
+
+
+def build_prompts(tokenizer, batch_size: int, prompt_tokens: int, spread: float = 0.0, seed: int = 0) -> List[List[int]]:
+    """Chat-templated prompt token ids, distinct per request
+
+    Each prompt is about `prompt_tokens` long; with spread > 0 lengths are drawn
+    uniformly from prompt_tokens * (1 ± spread).
+    """
+    rng = random.Random(seed)
+    filler = tokenizer.encode(FILLER * (int(prompt_tokens * (1 + spread)) // 16 + 2), add_special_tokens=False)
+    prompts = []
+    for i in range(batch_size):
+        target = round(prompt_tokens * rng.uniform(1 - spread, 1 + spread)) if spread else prompt_tokens
+        head, tail = f"Request {i}: ", "\nSummarize the text above."
+        overhead = len(chat_ids(tokenizer, head + tail))
+        body = tokenizer.decode(filler[:max(1, target - overhead)])
+        prompts.append(chat_ids(tokenizer, head + body + tail))
+    return prompts
+
+
+def load_tokenizer(model: str):
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model, padding_side="left")
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    return tokenizer
+
+
+# ---------------------------------------------------------------------------
+# Backends: each returns a GenerateFn over prompt token ids
+# ---------------------------------------------------------------------------
+
+def load_vllm(args: argparse.Namespace, tokenizer) -> GenerateFn:
+    from vllm import LLM, SamplingParams
+
+    llm = LLM(
+        model=args.model,
+        dtype=args.dtype,
+        max_model_len=args.max_model_len,
+        enable_prefix_caching=args.enable_prefix_caching,
+        seed=0,
+    )
+
+    def request_latency(output) -> Optional[float]:
+        metrics = getattr(output, "metrics", None)  # not populated by every engine version
+        if metrics is not None and getattr(metrics, "finished_time", None) and getattr(metrics, "arrival_time", None):
+            return metrics.finished_time - metrics.arrival_time
+        return None
+
+    def generate(prompts: List[List[int]], max_tokens: int) -> Tuple[float, int, List[float]]:
+        params = SamplingParams(temperature=0.0, max_tokens=max_tokens, ignore_eos=True)
+        started = time.perf_counter()
+        outputs = llm.generate([{"prompt_token_ids": ids} for ids in prompts], params, use_tqdm=False)
+        wall = time.perf_counter() - started
+        generated = sum(len(o.outputs[0].token_ids) for o in outputs)
+        return wall, generated, [request_latency(o) or wall for o in outputs]
+
+    return generate
+
+
+def load_hf_model(args: argparse.Namespace):
+    import torch
+    from transformers import AutoModelForCausalLM
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    if args.dtype == "auto":
+        dtype = torch.bfloat16 if device == "cuda" else torch.float32  # bf16 matmuls are slow on most CPUs
+    else:
+        dtype = getattr(torch, args.dtype)
+    return AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=dtype).to(device).eval(), device
+
+
+def load_hf(args: argparse.Namespace, tokenizer) -> GenerateFn:
+    """Naive batching: the whole batch is left-padded to its longest prompt"""
+    import torch
+
+    model, device = load_hf_model(args)
+
+    def generate(prompts: List[List[int]], max_tokens: int) -> Tuple[float, int, List[float]]:
+        batch = tokenizer.pad({"input_ids": prompts}, padding=True, return_tensors="pt").to(device)
+        started = time.perf_counter()
+        with torch.inference_mode():
+            out = model.generate(
+                **batch,
+                max_new_tokens=max_tokens,
+                min_new_tokens=max_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.pad_token_id,
+            )
+        if device == "cuda":
+            torch.cuda.synchronize()
+        wall = time.perf_counter() - started
+        generated = (out.shape[1] - batch["input_ids"].shape[1]) * len(prompts)
+        return wall, generated, [wall] * len(prompts)
+
+    return generate
+
+
+def load_hf_bucketed(args: argparse.Namespace, tokenizer) -> GenerateFn:
+    """Length-bucketed batches under a token budget (see hf_batching.py)"""
+    from hf_batching import BucketedBatcher
+
+    model, _ = load_hf_model(args)
+    batcher = BucketedBatcher(model, tokenizer, max_batch_tokens=args.max_batch_tokens)
+
+    def generate(prompts: List[List[int]], max_tokens: int) -> Tuple[float, int, List[float]]:
+        _, stats = batcher.generate(prompts, max_tokens, do_sample=False, min_new_tokens=max_tokens)
+        return stats["wall_s"], stats["generated_tokens"], stats["latencies"]
+
+    return generate
+
+
+BACKENDS: Dict[str, Callable[[argparse.Namespace, Any], GenerateFn]] = {
+    "vllm": load_vllm,
+    "hf": load_hf,
+    "hf-bucketed": load_hf_bucketed,
+}
+
+
+# ---------------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------------
+
+def quantile(values: Sequence[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+def sweep(backend: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    tokenizer = load_tokenizer(args.model)
+    with PeakMemory() as load_mem:
+        generate = BACKENDS[backend](args, tokenizer)
+        generate(build_prompts(tokenizer, 1, 16), 4)  # warm-up
+    points = list(itertools.product(args.batch_sizes, args.prompt_tokens, args.max_tokens))
+
+    rows = []
+    for batch_size, prompt_tokens, max_tokens in points:
+        prompts = build_prompts(tokenizer, batch_size, prompt_tokens, spread=args.length_spread)
+        ttft = min(generate(prompts, 1)[0] for _ in range(args.repeats))
+        with PeakMemory() as mem:
+            runs = [generate(prompts, max_tokens) for _ in range(args.repeats)]
+        wall, generated, latencies = min(runs, key=lambda run: run[0])
+        row = {
+            "backend": backend,
+            "model": args.model,
+            "batch_size": batch_size,
+            "prompt_tokens": round(statistics.mean(len(p) for p in prompts)),
+            "max_tokens": max_tokens,
+            "generated_tokens": generated,
+            "wall_s": round(wall, 4),
+            "tokens_per_s": round(generated / wall, 1),
+            "ttft_s": round(ttft, 4),
+            "latency_mean_s": round(statistics.mean(latencies), 4),
+            "latency_p50_s": round(quantile(latencies, 0.50), 4),
+            "latency_p95_s": round(quantile(latencies, 0.95), 4),
+            "peak_rss_mb": round(max(mem.peak_rss_mb, load_mem.peak_rss_mb), 1),
+            "peak_gpu_mb": round(mem.peak_gpu_mb, 1) if mem.peak_gpu_mb is not None else None,
+        }
+        rows.append(row)
+        print(
+            f"[{backend}] batch={batch_size:<4} prompt={row['prompt_tokens']:<5} max_tokens={max_tokens:<5} "
+            f"{row['tokens_per_s']:>8} tok/s  ttft {row['ttft_s'] * 1000:>8.1f} ms  "
+            f"p95 {row['latency_p95_s']:.3f} s  rss {row['peak_rss_mb']:.0f} MB",
+            file=sys.stderr,
+        )
+    return rows
+
+
+def run_isolated(backend: str, argv: List[str], script: str = __file__) -> List[Dict[str, Any]]:
+    """Run one backend's sweep (`script --worker backend`) in a fresh interpreter and collect its rows"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out = f.name
+    try:
+        cmd = [sys.executable, os.path.abspath(script), *argv, "--worker", backend, "--worker-out", out]
+        if subprocess.run(cmd).returncode != 0:
+            print(f"⚠️  {backend} benchmark failed, skipping", file=sys.stderr)
+            return []
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        os.unlink(out)
+
+
+def write_results(rows: List[Dict[str, Any]], out: str) -> None:
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out + ".json", "w") as f:
+        json.dump(rows, f, indent=2)
+    if rows:
+        with open(out + ".csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'backend':<8} {'batch':>5} {'prompt':>6} {'max_tok':>7} {'tok/s':>9} {'ttft ms':>9} "
+          f"{'p50 s':>7} {'p95 s':>7} {'rss MB':>8} {'gpu MB':>8}")
+    for r in rows:
+        gpu = f"{r['peak_gpu_mb']:.0f}" if r["peak_gpu_mb"] is not None else "-"
+        print(f"{r['backend']:<8} {r['batch_size']:>5} {r['prompt_tokens']:>6} {r['max_tokens']:>7} "
+              f"{r['tokens_per_s']:>9.1f} {r['ttft_s'] * 1000:>9.1f} {r['latency_p50_s']:>7.3f} "
+              f"{r['latency_p95_s']:>7.3f} {r['peak_rss_mb']:>8.0f} {gpu:>8}")
+
+
+def ints(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="vLLM vs Hugging Face generate throughput benchmark")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--backends", default="vllm,hf", help="comma-separated: " + ",".join(BACKENDS))
+    parser.add_argument("--batch-sizes", type=ints, default=[1, 8, 32])
+    parser.add_argument("--prompt-tokens", type=ints, default=[64, 512])
+    parser.add_argument("--max-tokens", type=ints, default=[32, 128])
+    parser.add_argument("--length-spread", type=float, default=0.0,
+                        help="vary prompt lengths by ±spread around --prompt-tokens (mixed-length workloads)")
+    parser.add_argument("--max-batch-tokens", type=int, default=16384, help="token budget per hf-bucketed batch")
+    parser.add_argument("--repeats", type=int, default=2, help="runs per point; the fastest is kept")
+    parser.add_argument("--dtype", default="auto")
+    parser.add_argument("--max-model-len", type=int, default=2048)
+    parser.add_argument("--enable-prefix-caching", action=argparse.BooleanOptionalAction, default=None,
+                        help="vLLM automatic prefix caching (default: the engine's own default)")
+    parser.add_argument("--out", default="bench_results", help="writes <out>.csv and <out>.json")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    if args.worker:
+        rows = sweep(args.worker, args)
+        with open(args.worker_out, "w") as f:
+            json.dump(rows, f)
+        return
+
+    rows: List[Dict[str, Any]] = []
+    for backend in args.backends.split(","):
+        if backend not in BACKENDS:
+            sys.exit(f"unknown backend '{backend}', choose from {', '.join(BACKENDS)}")
+        rows += run_isolated(backend, sys.argv[1:])
+    write_results(rows, args.out)
+    print_table(rows)
+    print(f"\nWrote {args.out}.csv and {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Automatic prefix caching on vLLM: shared-prefix workloads with caching off and on.
+
+    uv run python bench_prefix.py --num-prompts 32 --system-tokens 1024 --out results/prefix
+
+Each mode runs in its own subprocess (a fresh engine with
+enable_prefix_caching off or on) over the same workloads:
+
+- shared-system: one long system prompt followed by short, distinct questions
+- extraction: the 2-structured-output-libs SYSTEM + USER_TEMPLATE, with the
+  sample text last
+- extraction-dynamic-first: the same template with the text moved before the
+  rules, so requests share almost nothing (static content must come first)
+- multi-turn: a growing conversation; each request extends the previous one
+
+Per workload it reports:
+- prefill_ms: mean latency of single requests with max_tokens=1
+- cached_tokens: prompt tokens served from the cache, when the engine reports them
+- ttft_batch_s: one batch with max_tokens=1
+- tokens_per_s: generation throughput of one batch with --max-tokens
+
+Every phase uses fresh dynamic text, so only the genuinely shared prefix can
+hit the cache. The static prefixes are warmed once before measuring, as they
+would be in a running server.
+"""
+
+import argparse
+import json
+import os
+import runpy
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from bench import DEFAULT_MODEL, FILLER, load_tokenizer, run_isolated, write_results
+
+LIBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "2-structured-output-libs")
+QUERIES = [
+    "Summarize the policy in one sentence.",
+    "Which rule applies to refunds?",
+    "Is weekend support covered?",
+    "Who approves exceptions?",
+    "List two obligations of the customer.",
+    "What happens after a missed deadline?",
+]
+CONVERSATION = [
+    "I'm planning a three-day trip to Lisbon in May.",
+    "Which neighbourhoods are best for a first visit?",
+    "How do I get there from the airport?",
+    "Recommend a day trip outside the city.",
+    "What should I pack for the weather?",
+    "Any food I must try?",
+    "How much cash should I carry?",
+    "Give me a short packing checklist.",
+]
+
+
+def template_ids(tokenizer, messages: List[Dict[str, str]]) -> List[int]:
+    return tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True, return_dict=False)
+
+
+def build_workloads(tokenizer, n: int, variant: str, system_tokens: int) -> Dict[str, List[List[int]]]:
+    """Prompt token ids per workload; `variant` changes only the dynamic text"""
+    prompts = runpy.run_path(os.path.join(LIBS_DIR, "prompts.py"))
+    samples = runpy.run_path(os.path.join(LIBS_DIR, "data.py"))["SAMPLES"]
+    filler = tokenizer.encode(FILLER * (system_tokens // 16 + 2), add_special_tokens=False)
+    policy = "You are a concise support assistant. Company policy:\n" + tokenizer.decode(filler[:system_tokens])
+    rules, _, _ = prompts["USER_TEMPLATE"].partition("Text:")
+
+    def text(i: int) -> str:
+        return f"{samples[i % len(samples)]} [{variant}-{i}]"
+
+    conversation: List[Dict[str, str]] = []
+    multi_turn = []
+    for i in range(n):
+        conversation.append({"role": "user", "content": f"{CONVERSATION[i % len(CONVERSATION)]} ({variant})"})
+        multi_turn.append(template_ids(tokenizer, [{"role": "system", "content": "You are a travel assistant."}, *conversation]))
+        conversation.append({"role": "assistant", "content": f"Here is my answer to question {i + 1}: " + FILLER})
+
+    return {
+        "shared-system": [
+            template_ids(tokenizer, [{"role": "system", "content": policy},
+                                     {"role": "user", "content": f"{QUERIES[i % len(QUERIES)]} ({variant}-{i})"}])
+            for i in range(n)
+        ],
+        "extraction": [
+            template_ids(tokenizer, [{"role": "system", "content": prompts["SYSTEM"]},
+                                     {"role": "user", "content": prompts["USER_TEMPLATE"].format(TEXT=text(i))}])
+            for i in range(n)
+        ],
+        "extraction-dynamic-first": [
+            template_ids(tokenizer, [{"role": "user", "content": f"Text:\n---\n{text(i)}\n---\n\n{rules}\n{prompts['SYSTEM']}"}])
+            for i in range(n)
+        ],
+        "multi-turn": multi_turn,
+    }
+
+
+def sweep(mode: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from vllm import LLM, SamplingParams
+
+    tokenizer = load_tokenizer(args.model)
+    llm = LLM(model=args.model, dtype=args.dtype, max_model_len=args.max_model_len,
+              enable_prefix_caching=mode == "on", seed=0)
+    first = SamplingParams(temperature=0.0, max_tokens=1)
+    full = SamplingParams(temperature=0.0, max_tokens=args.max_tokens, ignore_eos=True)
+
+    def generate(prompts: List[List[int]], params: SamplingParams):
+        return llm.generate([{"prompt_token_ids": ids} for ids in prompts], params, use_tqdm=False)
+
+    for warm in build_workloads(tokenizer, 1, "warm", args.system_tokens).values():
+        generate(warm, first)
+
+    phases = {v: build_workloads(tokenizer, args.num_prompts, v, args.system_tokens) for v in ("a", "b", "c")}
+    rows = []
+    for workload in phases["a"]:
+        prefill, cached = [], []
+        for ids in phases["a"][workload]:
+            started = time.perf_counter()
+            output = generate([ids], first)[0]
+            prefill.append(time.perf_counter() - started)
+            if getattr(output, "num_cached_tokens", None) is not None:
+                cached.append(output.num_cached_tokens)
+
+        started = time.perf_counter()
+        generate(phases["b"][workload], first)
+        ttft_batch = time.perf_counter() - started
+
+        started = time.perf_counter()
+        outputs = generate(phases["c"][workload], full)
+        wall = time.perf_counter() - started
+        generated = sum(len(o.outputs[0].token_ids) for o in outputs)
+
+        rows.append({
+            "prefix_caching": mode,
+            "workload": workload,
+            "prompts": args.num_prompts,
+            "prompt_tokens": round(statistics.mean(len(p) for p in phases["a"][workload])),
+            "cached_tokens": round(statistics.mean(cached)) if cached else None,
+            "prefill_ms": round(statistics.mean(prefill) * 1000, 2),
+            "ttft_batch_s": round(ttft_batch, 4),
+            "tokens_per_s": round(generated / wall, 1),
+        })
+        print(f"[caching {mode}] {workload:<26} prefill {rows[-1]['prefill_ms']:>8.1f} ms  "
+              f"cached {rows[-1]['cached_tokens']}/{rows[-1]['prompt_tokens']}", file=sys.stderr)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="vLLM prefix caching benchmark")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--num-prompts", type=int, default=32)
+    parser.add_argument("--system-tokens", type=int, default=1024, help="length of the shared system prompt")
+    parser.add_argument("--max-tokens", type=int, default=32)
+    parser.add_argument("--dtype", default="auto")
+    parser.add_argument("--max-model-len", type=int, default=4096)
+    parser.add_argument("--out", default="bench_prefix")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.worker_out, "w") as f:
+            json.dump(sweep(args.worker, args), f)
+        return
+
+    rows = run_isolated("off", sys.argv[1:], script=__file__) + run_isolated("on", sys.argv[1:], script=__file__)
+    write_results(rows, args.out)
+    by_key = {(r["prefix_caching"], r["workload"]): r for r in rows}
+    print(f"\n{'workload':<26} {'prompt':>7} {'cached':>7} {'prefill ms off/on':>19} {'ttft batch s off/on':>21} "
+          f"{'tok/s off/on':>17}")
+    for workload in dict.fromkeys(r["workload"] for r in rows):
+        off, on = by_key.get(("off", workload)), by_key.get(("on", workload))
+        if not (off and on):
+            continue
+        print(f"{workload:<26} {on['prompt_tokens']:>7} {str(on['cached_tokens']):>7} "
+              f"{off['prefill_ms']:>9.1f}/{on['prefill_ms']:<9.1f} {off['ttft_batch_s']:>10.3f}/{on['ttft_batch_s']:<10.3f} "
+              f"{off['tokens_per_s']:>8.0f}/{on['tokens_per_s']:<8.0f}")
+    print(f"\nWrote {args.out}.csv and {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
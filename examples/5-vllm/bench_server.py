@@ -0,0 +1,116 @@
+"""
+Aggregate throughput of server.py under concurrent clients.
+
+    uv run python server.py --port 8001 &
+    uv run python bench_server.py --base-url http://127.0.0.1:8001/v1 --concurrency 1,4,16,64
+
+Concurrency 1 sends one request at a time: the sequential `generate` pattern
+of main.py, plus HTTP overhead. Higher levels let the engine batch requests
+continuously. Every level sends the same chat prompts with a fixed
+max_tokens, streamed so that TTFT can be measured. Results are written to
+<out>.json.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+from openai import AsyncOpenAI
+
+QUERIES = [
+    "Summarize the plot of Inception in two sentences.",
+    "List three practical uses of a hash map.",
+    "Explain what a KV cache is to a new engineer.",
+    "Write a haiku about batching requests.",
+    "What are the trade-offs of left padding?",
+    "Describe continuous batching in one paragraph.",
+    "Give two tips for writing clear commit messages.",
+    "Why does prefill cost more than a decode step?",
+]
+
+
+async def one_request(client: AsyncOpenAI, model: str, query: str, max_tokens: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    ttft, tokens = None, 0
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": "You are concise."}, {"role": "user", "content": query}],
+        max_tokens=max_tokens,
+        temperature=0.0,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    async for chunk in stream:
+        if chunk.usage:
+            tokens = chunk.usage.completion_tokens
+        if ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            ttft = time.perf_counter() - started
+    return {"latency": time.perf_counter() - started, "ttft": ttft or 0.0, "tokens": tokens}
+
+
+async def run_level(client: AsyncOpenAI, args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(QUERIES[i % len(QUERIES)])
+    samples: List[Dict[str, Any]] = []
+
+    async def worker() -> None:
+        while not queue.empty():
+            samples.append(await one_request(client, args.model, queue.get_nowait(), args.max_tokens))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    def q(values: List[float], p: int) -> float:
+        return statistics.quantiles(values, n=100, method="inclusive")[p - 1] if len(values) > 1 else values[0]
+
+    latencies = [s["latency"] for s in samples]
+    ttfts = [s["ttft"] for s in samples]
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(samples) / wall, 2),
+        "tokens_per_s": round(sum(s["tokens"] for s in samples) / wall, 1),
+        "latency_p50_s": round(q(latencies, 50), 3),
+        "latency_p95_s": round(q(latencies, 95), 3),
+        "ttft_p50_s": round(q(ttfts, 50), 3),
+        "ttft_p95_s": round(q(ttfts, 95), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent-client throughput of the vLLM chat server")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:8001/v1"))
+    parser.add_argument("--model", default="local")
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--out", default="bench_server")
+    args = parser.parse_args()
+
+    client = AsyncOpenAI(base_url=args.base_url, api_key=os.getenv("OPENAI_API_KEY", "local"), max_retries=0)
+    await one_request(client, args.model, QUERIES[0], 8)  # warm-up
+    rows = []
+    for level in [int(c) for c in args.concurrency.split(",")]:
+        rows.append(await run_level(client, args, level))
+        r = rows[-1]
+        print(f"concurrency {level:>4}: {r['tokens_per_s']:>8} tok/s  {r['requests_per_s']:>6} req/s  "
+              f"latency p50 {r['latency_p50_s']:.2f}s p95 {r['latency_p95_s']:.2f}s  "
+              f"ttft p50 {r['ttft_p50_s'] * 1000:.0f}ms")
+    await client.close()
+
+    baseline = rows[0]["tokens_per_s"] or 1.0
+    print("\nSpeed-up over sequential requests: " +
+          ", ".join(f"x{r['concurrency']}: {r['tokens_per_s'] / baseline:.1f}x" for r in rows))
+    with open(args.out + ".json", "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
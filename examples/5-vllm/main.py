@@ -1,24 +1,25 @@
-# import torch
+import os
+
 from vllm import LLM, SamplingParams
 from dotenv import load_dotenv
-# from transformers import AutoTokenizer
+load_dotenv()
+
+# Any Hugging Face chat model works; the default is small enough for a CPU-only machine
+MODEL_NAME = os.getenv("VLLM_MODEL", "HuggingFaceTB/SmolLM2-135M-Instruct")
+
 
 def main():
     llm = LLM(
-    model=MODEL_NAME,
-    max_model_len=2048,
-    tensor_parallel_size=2,
-    gpu_memory_utilization=0.95,
-    gpu_memory_utilization_threshold=0.95,
-    gpu_memory_utilization_threshold_type="absolute",
+        model=MODEL_NAME,
+        max_model_len=2048,
+        tensor_parallel_size=int(os.getenv("VLLM_TENSOR_PARALLEL_SIZE", "1")),
     )
 
-    llm.generate(
-        "What is the capital of France?",
-        SamplingParams(temperature=0.5, top_p=0.95),
+    outputs = llm.chat(
+        [{"role": "user", "content": "What is the capital of France?"}],
+        SamplingParams(temperature=0.5, top_p=0.95, max_tokens=64),
     )
-    print("Hello from 5-vllm!")
-
+    print(outputs[0].outputs[0].text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,318 @@
+"""
+OpenAI-compatible chat server on vLLM's async engine (continuous batching).
+
+    uv run python server.py --port 8001
+    export OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+
+Every request is submitted to one AsyncLLMEngine, so concurrent requests are
+batched together token by token instead of waiting for each other. The other
+examples (`raw_json`, `Agent.reason`, the memory agent) point at it unchanged.
+
+Supported: `messages`, `max_tokens`/`max_completion_tokens`, `temperature`,
+`top_p`, `stop`, `seed`, `stream` (SSE, with `stream_options.include_usage`),
+and `usage`. `tools` (and legacy `functions`) are best effort. They are rendered
+through the model's chat template, and `<tool_call>{...}</tool_call>` blocks or
+a bare `{"name": ..., "arguments": ...}` object in the output become `tool_calls`.
+Whichever model the client asks for, the local model answers. With
+--enable-prefix-caching, requests that share a prompt prefix (system prompt,
+tool definitions, extraction template) reuse its KV cache and skip that part
+of prefill. This only works when the static content comes first in the prompt.
+
+Guided decoding: `response_format` (`json_schema` or `json_object`) and forced
+function calls (`tool_choice={"type": "function", ...}`, `function_call={"name": ...}`,
+or `tool_choice="required"` with a single tool) constrain sampling to the JSON
+schema. Every output then validates by construction, and no retry round trips
+are needed. vLLM compiles each schema into a grammar once and caches it.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from bench import DEFAULT_MODEL, load_tokenizer
+
+if TYPE_CHECKING:
+    from vllm import SamplingParams
+
+load_dotenv()
+
+TOOL_CALL_RE = re.compile(r"<tool_call>\s*(\{.*?\})\s*</tool_call>", re.DOTALL)
+
+
+class ChatEngine:
+    """Turns OpenAI chat requests into engine requests over the model's chat template"""
+
+    def __init__(self, args: argparse.Namespace):
+        from vllm import AsyncEngineArgs, AsyncLLMEngine  # deferred so --help and imports stay fast
+
+        self.model_name = args.model
+        self.tokenizer = load_tokenizer(args.model)
+        self.engine = AsyncLLMEngine.from_engine_args(AsyncEngineArgs(
+            model=args.model,
+            dtype=args.dtype,
+            max_model_len=args.max_model_len,
+            enable_prefix_caching=args.enable_prefix_caching,
+            tensor_parallel_size=args.tensor_parallel_size,
+        ))
+
+    # -- request translation ------------------------------------------------
+
+    def prompt_ids(self, body: Dict[str, Any]) -> List[int]:
+        messages = []
+        for message in body.get("messages", []):
+            message = {**message, "content": message.get("content") or ""}
+            if message.get("tool_calls"):
+                # HF chat templates expect tool-call arguments as objects
+                message["tool_calls"] = [
+                    {**call, "function": {**call["function"], "arguments": _loads(call["function"]["arguments"])}}
+                    for call in message["tool_calls"]
+                ]
+            messages.append(message)
+        return self.tokenizer.apply_chat_template(
+            messages, tools=tools_of(body) or None, tokenize=True, add_generation_prompt=True, return_dict=False
+        )
+
+    def sampling_params(self, body: Dict[str, Any]) -> "SamplingParams":
+        from vllm import SamplingParams
+
+        stop = body.get("stop")
+        forced = forced_function(body)
+        fmt = body.get("response_format") or {}
+        if forced is not None:
+            guided = guided_kwargs(forced.get("parameters") or {"type": "object"})
+        elif fmt.get("type") == "json_schema":
+            guided = guided_kwargs(fmt["json_schema"].get("schema", {}))
+        elif fmt.get("type") == "json_object":
+            guided = guided_kwargs(None)
+        else:
+            guided = {}
+        return SamplingParams(
+            **guided,
+            max_tokens=body.get("max_completion_tokens") or body.get("max_tokens") or 512,
+            temperature=body.get("temperature", 1.0),
+            top_p=body.get("top_p", 1.0),
+            stop=[stop] if isinstance(stop, str) else stop,
+            seed=body.get("seed"),
+        )
+
+    async def generate(self, body: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (delta_text, request_output) as the engine produces tokens"""
+        sent = 0
+        request_id = uuid.uuid4().hex
+        prompt = {"prompt_token_ids": self.prompt_ids(body)}
+        async for output in self.engine.generate(prompt, self.sampling_params(body), request_id):
+            text = output.outputs[0].text
+            yield text[sent:], output
+            sent = len(text)
+
+
+def guided_kwargs(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """SamplingParams kwargs constraining output to a JSON schema (None: any JSON object)"""
+    try:
+        from vllm.sampling_params import StructuredOutputsParams  # vLLM >= 0.11
+    except ImportError:
+        from vllm.sampling_params import GuidedDecodingParams
+
+        params = GuidedDecodingParams(json=schema) if schema is not None else GuidedDecodingParams(json_object=True)
+        return {"guided_decoding": params}
+    params = StructuredOutputsParams(json=schema) if schema is not None else StructuredOutputsParams(json_object=True)
+    return {"structured_outputs": params}
+
+
+def forced_function(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The function definition the request forces the model to call, if any"""
+    tools = tools_of(body)
+    choice = body.get("tool_choice") or body.get("function_call")
+    if isinstance(choice, dict):
+        name = choice.get("function", choice).get("name")
+        return next((t["function"] for t in tools if t["function"]["name"] == name), None)
+    if choice == "required" and len(tools) == 1:
+        return tools[0]["function"]
+    return None
+
+
+def tool_call(name: str, arguments: str) -> Dict[str, Any]:
+    return {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function", "function": {"name": name, "arguments": arguments}}
+
+
+def tools_of(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if body.get("tools"):
+        return body["tools"]
+    return [{"type": "function", "function": fn} for fn in body.get("functions") or []]
+
+
+def _loads(arguments: Any) -> Any:
+    try:
+        return json.loads(arguments) if isinstance(arguments, str) else arguments
+    except json.JSONDecodeError:
+        return arguments
+
+
+def parse_tool_calls(text: str, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Best-effort extraction of tool calls from model text"""
+    names = {tool["function"]["name"] for tool in tools}
+    candidates = TOOL_CALL_RE.findall(text) or [text.strip()]
+    calls = []
+    for candidate in candidates:
+        data = _loads(candidate)
+        if isinstance(data, dict) and data.get("name") in names:
+            arguments = data.get("arguments", data.get("parameters", {}))
+            calls.append(tool_call(data["name"], arguments if isinstance(arguments, str) else json.dumps(arguments)))
+    return calls
+
+
+def usage_of(output) -> Dict[str, int]:
+    prompt = len(output.prompt_token_ids or [])
+    completion = len(output.outputs[0].token_ids)
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def finish_reason(output, tool_calls: List[Dict[str, Any]]) -> str:
+    if tool_calls:
+        return "tool_calls"
+    return "length" if output.outputs[0].finish_reason == "length" else "stop"
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    state: Dict[str, ChatEngine] = {}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        state["chat"] = ChatEngine(args)
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": state["chat"].model_name, "object": "model", "owned_by": "vllm"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        chat = state["chat"]
+        if body.get("n", 1) != 1:
+            return JSONResponse({"error": {"message": "only n=1 is supported", "type": "invalid_request_error"}}, 400)
+        cid, created = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time())
+        tools = tools_of(body)
+        legacy_functions = bool(body.get("functions")) and not body.get("tools")
+        forced = forced_function(body)  # guided: the whole output is this function's arguments
+
+        def message_fields(text: str, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+            if calls and legacy_functions:
+                return {"content": None, "function_call": calls[0]["function"]}
+            if calls:
+                return {"content": None, "tool_calls": calls}
+            return {"content": text}
+
+        if not body.get("stream"):
+            final = None
+            async for _, output in chat.generate(body):
+                final = output
+            text = final.outputs[0].text
+            if forced is not None:
+                calls = [tool_call(forced["name"], text)]
+            else:
+                calls = parse_tool_calls(text, tools) if tools else []
+            reason = finish_reason(final, calls)
+            if reason == "tool_calls" and legacy_functions:
+                reason = "function_call"
+            return {
+                "id": cid, "object": "chat.completion", "created": created, "model": chat.model_name,
+                "choices": [{"index": 0, "message": {"role": "assistant", **message_fields(text, calls)},
+                             "finish_reason": reason, "logprobs": None}],
+                "usage": usage_of(final),
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta: Dict[str, Any], reason: Optional[str] = None) -> str:
+            payload = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": chat.model_name,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": reason, "logprobs": None}]}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def usage_chunk(final) -> str:
+            payload = {"id": cid, "object": "chat.completion.chunk", "created": created,
+                       "model": chat.model_name, "choices": [], "usage": usage_of(final)}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def forced_events() -> AsyncIterator[str]:
+            """Stream a guided function call as argument deltas"""
+            call = tool_call(forced["name"], "")
+            if legacy_functions:
+                yield chunk({"role": "assistant", "content": None, "function_call": call["function"]})
+            else:
+                yield chunk({"role": "assistant", "content": None, "tool_calls": [{"index": 0, **call}]})
+            final = None
+            async for delta, output in chat.generate(body):
+                final = output
+                if delta and legacy_functions:
+                    yield chunk({"function_call": {"arguments": delta}})
+                elif delta:
+                    yield chunk({"tool_calls": [{"index": 0, "function": {"arguments": delta}}]})
+            yield chunk({}, "function_call" if legacy_functions else "tool_calls")
+            if include_usage:
+                yield usage_chunk(final)
+            yield "data: [DONE]\n\n"
+
+        async def events() -> AsyncIterator[str]:
+            yield chunk({"role": "assistant", "content": ""})
+            text, held, final = "", bool(tools), None
+            async for delta, output in chat.generate(body):
+                text, final = text + delta, output
+                # With tools, hold back output that may turn out to be a tool call
+                if held and text.lstrip() and not text.lstrip().startswith(("<tool_call>", "{")):
+                    held = False
+                    delta = text
+                if not held and delta:
+                    yield chunk({"content": delta})
+            calls = parse_tool_calls(text, tools) if held else []
+            if held and not calls:
+                yield chunk({"content": text})
+            for index, call in enumerate(calls):
+                if legacy_functions:
+                    yield chunk({"function_call": call["function"]})
+                    break
+                yield chunk({"tool_calls": [{"index": index, **call}]})
+            reason = finish_reason(final, calls)
+            yield chunk({}, "function_call" if calls and legacy_functions else reason)
+            if include_usage:
+                yield usage_chunk(final)
+            yield "data: [DONE]\n\n"
+
+        stream = forced_events() if forced is not None else events()
+        return StreamingResponse(stream, media_type="text/event-stream")
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible server on vLLM's async engine")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--dtype", default="auto")
+    parser.add_argument("--max-model-len", type=int, default=4096)
+    parser.add_argument("--enable-prefix-caching", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse KV cache across requests sharing a prompt prefix (default: the engine's own default)")
+    parser.add_argument("--tensor-parallel-size", type=int, default=int(os.getenv("VLLM_TENSOR_PARALLEL_SIZE", "1")))
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
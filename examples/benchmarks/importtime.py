@@ -0,0 +1,226 @@
+"""
+Startup import cost of every example entry point, checked against a baseline.
+
+    python importtime.py                     # compare with importtime_baseline.json
+    python importtime.py --update            # record a new baseline
+    python importtime.py --python python3 --only 3-memory
+
+Each entry point is imported (not run) with `python -X importtime -c "import
+<module>"` from its project directory, --runs times after one warm-up, using
+the project's own venv (`uv sync` it first; projects without a pyproject.toml
+are stdlib-only and use this interpreter). The
+fastest cumulative import time is reported (noise only ever adds time), together with the heaviest
+top-level imports and the third-party packages pulled in.
+
+Every run also imports a fixed set of stdlib modules (CALIBRATION) in a
+fresh interpreter, and the baseline is scaled by how much slower or faster that
+is now than when the baseline was recorded. This cancels out machine speed and
+background load. An entry point regresses when it is slower than its scaled
+baseline by more than --tolerance (relative) and --min-delta-ms (absolute), or
+when it now imports a third-party package the baseline did not. An entry
+point that fails to import, or whose venv is missing, fails the run: an
+unmeasured entry point cannot be gated. The script exits with status 1 on
+any regression or failure, and --update refuses to record failures.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+EXAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "importtime_baseline.json")
+DEFAULT_PYTHON = "{project}/.venv/bin/python"
+ENTRY_POINTS = {
+    "1-strctured-output": ["main", "function_call_fail", "guided_compare", "repair"],
+    "2-structured-output-libs": ["benchmark_accuracy", "instructor_demo", "pydanticai_demo", "baml_demo",
+                                 "guided_demo", "cascade"],
+    "3-memory-and-context-window": ["main", "memory", "bench_memory"],
+    "4-agents": ["main", "scheduler", "bench_scheduler"],
+    "5-vllm": ["bench", "server", "bench_server", "bench_prefix", "hf_batching"],
+    "mock-openai": ["server", "loadgen"],
+}
+# Generated code some entry points import; regenerated before measuring (not committed)
+SETUP = {"2-structured-output-libs": ["baml-cli", "generate"]}
+CALIBRATION = ["asyncio", "decimal", "email.mime.multipart", "http.client", "json", "logging", "xml.etree.ElementTree"]
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """(cumulative_us, depth, module) for every line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def entry_cost(rows: List[Tuple[int, int, str]], module: str) -> Tuple[float, Dict[str, float]]:
+    """Cumulative ms of `module` and of its direct imports; interpreter startup is excluded"""
+    children: List[Tuple[int, str]] = []
+    for cumulative, depth, name in rows:
+        if depth == 0 and name == module:
+            top = sorted(children, reverse=True)[:5]
+            return cumulative / 1000, {m: round(c / 1000, 1) for c, m in top}
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((cumulative, name))
+    return 0.0, {}
+
+
+def third_party(rows: List[Tuple[int, int, str]], project_dir: str) -> List[str]:
+    local = {os.path.splitext(name)[0] for name in os.listdir(project_dir)}
+    packages = {module.split(".")[0] for _, _, module in rows}
+    return sorted(p for p in packages
+                  if p not in sys.stdlib_module_names and p not in local and not p.startswith("_"))
+
+
+def calibration_ms(python: str, cwd: str) -> float:
+    proc = subprocess.run([python, "-X", "importtime", "-c", f"import {', '.join(CALIBRATION)}"],
+                          cwd=cwd, capture_output=True, text=True, check=True)
+    return sum(c for c, depth, name in parse_importtime(proc.stderr) if depth == 0 and name in CALIBRATION) / 1000
+
+
+def interpreter(python: str, project_dir: str) -> str:
+    """`python` with {project} expanded; stdlib-only projects without a venv use this interpreter"""
+    path = python.format(project=project_dir)
+    if (path != python and not os.path.exists(path)
+            and not os.path.exists(os.path.join(project_dir, "pyproject.toml"))):
+        return sys.executable
+    return path
+
+
+def setup(project: str, python: str) -> Optional[str]:
+    """Run the project's SETUP command with its venv's tools; returns an error, if any"""
+    if project not in SETUP:
+        return None
+    project_dir = os.path.join(EXAMPLES_DIR, project)
+    tool, *rest = SETUP[project]
+    command = [os.path.join(os.path.dirname(interpreter(python, project_dir)), tool), *rest]
+    try:
+        proc = subprocess.run(command, cwd=project_dir, capture_output=True, text=True)
+    except FileNotFoundError:
+        return f"{' '.join(SETUP[project])} failed: no {command[0]} (run `uv sync` in {project})"
+    if proc.returncode != 0:
+        lines = (proc.stderr or proc.stdout).strip().splitlines()
+        return f"{' '.join(SETUP[project])} failed: {lines[-1] if lines else f'exit status {proc.returncode}'}"
+    return None
+
+
+def measure(project: str, module: str, python: str, runs: int) -> Dict[str, Any]:
+    project_dir = os.path.join(EXAMPLES_DIR, project)
+    python = interpreter(python, project_dir)
+    command = [python, "-X", "importtime", "-c", f"import {module}"]
+    totals, calibration, rows, heaviest = [], [], [], {}
+    for i in range(runs + 1):
+        try:
+            proc = subprocess.run(command, cwd=project_dir, capture_output=True, text=True)
+        except FileNotFoundError:
+            return {"error": f"no interpreter at {python} (run `uv sync` in {project})"}
+        if proc.returncode != 0:
+            errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            return {"error": errors[-1] if errors else f"exit status {proc.returncode}"}
+        rows = parse_importtime(proc.stderr)
+        total, heaviest = entry_cost(rows, module)
+        if i:  # the first run warms the bytecode and filesystem caches
+            totals.append(total)
+            calibration.append(calibration_ms(python, project_dir))
+    return {
+        "ms": round(min(totals), 1),
+        "calibration_ms": round(min(calibration), 1),
+        "heaviest": heaviest,
+        "packages": third_party(rows, project_dir),
+    }
+
+
+def scaled_baseline(current: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+    """Baseline ms adjusted to the speed of the machine the current run is on"""
+    if not baseline.get("calibration_ms"):
+        return baseline["ms"]
+    return baseline["ms"] * current["calibration_ms"] / baseline["calibration_ms"]
+
+
+def compare(current: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float,
+            min_delta_ms: float) -> Tuple[str, List[str]]:
+    """("ok" | "regressed" | "new" | "failed", reasons)"""
+    if "error" in current:
+        return "failed", [current["error"]]
+    if not baseline or "error" in baseline:
+        return "new", []
+    reasons = []
+    expected = scaled_baseline(current, baseline)
+    delta = current["ms"] - expected
+    if delta > min_delta_ms and current["ms"] > expected * (1 + tolerance):
+        reasons.append(f"+{delta:.0f} ms ({delta / expected:+.0%})")
+    added = sorted(set(current["packages"]) - set(baseline.get("packages", [])))
+    if added:
+        reasons.append(f"now imports {', '.join(added)}")
+    return ("regressed" if reasons else "ok"), reasons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the example entry points")
+    parser.add_argument("--python", default=DEFAULT_PYTHON,
+                        help="interpreter to measure; {project} expands to the project directory")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", default=None, help="substring filter on '<project>/<module>'")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0, help="ignore slowdowns below this")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    entries = [f"{p}/{m}" for p, modules in ENTRY_POINTS.items() for m in modules
+               if args.only is None or args.only in f"{p}/{m}"]
+
+    results, regressed, failed = {}, [], []
+    setup_errors = {p: setup(p, args.python) for p in dict.fromkeys(e.split("/")[0] for e in entries)}
+    print(f"{'entry point':<46} {'ms':>8} {'base ms':>8}  {'status':<9} details")
+    for entry in entries:
+        project, module = entry.split("/")
+        current = ({"error": setup_errors[project]} if setup_errors[project]
+                   else measure(project, module, args.python, args.runs))
+        results[entry] = current
+        base = baseline.get("entries", {}).get(entry)
+        status, reasons = compare(current, base, args.tolerance, args.min_delta_ms)
+        if status == "regressed":
+            regressed.append(entry)
+        elif status == "failed":
+            failed.append(entry)
+        if status in ("ok", "new"):
+            reasons = [", ".join(f"{m} {ms:.0f}" for m, ms in current["heaviest"].items())]
+        base_ms = f"{scaled_baseline(current, base):.1f}" if "ms" in current and base and "ms" in base else "-"
+        ms = f"{current['ms']:.1f}" if "ms" in current else "-"
+        print(f"{entry:<46} {ms:>8} {base_ms:>8}  {status:<9} {'; '.join(reasons)}")
+
+    if failed:
+        print(f"\n{len(failed)} entry point(s) failed to import: {', '.join(failed)}")
+    if args.update:
+        if failed:
+            print("Baseline not written; fix the failures (or narrow --only) first")
+            sys.exit(1)
+        entries_out = {**baseline.get("entries", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "entries": entries_out}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {args.baseline}")
+        return
+    if regressed:
+        print(f"\n{len(regressed)} entry point(s) regressed: {', '.join(regressed)}")
+    if regressed or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
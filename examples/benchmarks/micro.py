@@ -0,0 +1,377 @@
+"""
+Offline micro-benchmarks for the pure-Python hot paths of the examples.
+
+    python micro.py                  # compare with micro_baseline.json
+    python micro.py --update         # record a new baseline
+    python micro.py --only memory --samples 30
+
+Each benchmark runs one function over generated inputs of increasing size, with
+no network and no GPU:
+
+- 1-strctured-output: try_extract_json, valid_movie
+- 2-structured-output-libs: eval.score_sample, eval.aggregate,
+  Task.model_validate, Task._normalize_tags
+- 4-agents: Tools.calculator (expression cache cleared before every sample)
+- 3-memory-and-context-window: ShortTermMemory.append + last_window, and
+  MemoryStore.search with a stub embedder (needs faiss)
+
+Every sample is timed right after a fixed pure-Python calibration workload, and
+the comparison uses sample / calibration. This cancels out machine speed and
+background load. A benchmark regresses when a one-sided Mann-Whitney U test
+says its normalised samples are larger than the baseline's (p < --alpha), and
+the median is more than --min-effect slower. The script exits with status 1 on
+any regression. A benchmark whose dependencies are missing is skipped if it
+has no baseline and fails the run if it has one. The 3-memory-and-context-window
+venv has the dependencies of every benchmark, so record and compare with it:
+
+    ../3-memory-and-context-window/.venv/bin/python micro.py
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import re
+import statistics
+import string
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+EXAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+TARGET_SAMPLE_S = 0.002  # each timed run loops the workload for at least this long
+
+_modules: Dict[Tuple[str, str], Any] = {}
+
+
+def _local_modules(path: str) -> List[str]:
+    """Names in sys.modules of modules loaded from the project at `path` (not from its venv)"""
+    prefix, venv = os.path.join(path, ""), os.path.join(path, ".venv", "")
+    names = []
+    for name, mod in list(sys.modules.items()):
+        file = os.path.abspath(getattr(mod, "__file__", None) or "")
+        if file.startswith(prefix) and not file.startswith(venv):
+            names.append(name)
+    return names
+
+
+def load(project: str, module: str) -> Any:
+    """Import <project>/<module>.py under a unique name, with the project on sys.path"""
+    key = (project, module)
+    if key not in _modules:
+        path = os.path.join(EXAMPLES_DIR, project)
+        name = "bench_" + re.sub(r"\W", "_", f"{project}_{module}")
+        sys.path.insert(0, path)
+        try:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(path, f"{module}.py"))
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+        finally:
+            sys.path.remove(path)
+            # Projects reuse module names (main, openai_client, ...): forget this
+            # project's siblings so the next project imports its own. The loaded
+            # module keeps references to the ones it uses.
+            for local in _local_modules(path):
+                del sys.modules[local]
+        _modules[key] = mod
+    return _modules[key]
+
+
+# -- input generators ------------------------------------------------------
+
+def words(rng: random.Random, n: int) -> str:
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(n))
+
+
+def movie(rng: random.Random, extra_fields: int = 0) -> Dict[str, Any]:
+    d: Dict[str, Any] = {"title": words(rng, 2).title(), "director": words(rng, 2).title(),
+                         "year": rng.choice([rng.randint(1900, 2025), str(rng.randint(1900, 2025)), "unknown"])}
+    for i in range(extra_fields):
+        d[f"field_{i}"] = words(rng, 3)
+    if rng.random() < 0.2:
+        d.pop(rng.choice(["title", "director", "year"]))
+    return d
+
+
+def task_dict(rng: random.Random, n_tags: int) -> Dict[str, Any]:
+    pool = ["Backend", "frontend", "urgent", "Docs", "review", "infra", "bug", "release"]
+    return {
+        "description": words(rng, 6),
+        "priority": rng.choice(["low", "medium", "high", "urgent"]),
+        "owner": "@" + words(rng, 1),
+        # case and whitespace variants of a small pool, so normalisation dedups to <= 8 tags
+        "tags": [rng.choice([t, t.upper(), f"  {t} "]) for t in rng.choices(pool, k=n_tags)],
+        "deadline": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "confidence": round(rng.random(), 2),
+    }
+
+
+def expression(rng: random.Random, terms: int) -> str:
+    parts = [str(rng.randint(1, 999))]
+    for _ in range(terms - 1):
+        operand = rng.choice([str(rng.randint(1, 999)), f"sqrt({rng.randint(1, 999)})", f"({rng.randint(1, 99)} - 7)"])
+        parts.append(rng.choice(["+", "-", "*", "/"]) + " " + operand)
+    return " ".join(parts)
+
+
+class StubEmbedder:
+    """Deterministic hash-seeded unit vectors in place of SentenceTransformer"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts: Sequence[str]):
+        import numpy as np
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            v = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dim).astype(np.float32)
+            out[i] = v / np.linalg.norm(v)
+        return out
+
+
+# -- benchmarks ------------------------------------------------------------
+# Each setup(size, rng) builds its inputs and returns (workload, items): the
+# workload is timed as a whole and reported per item.
+
+BATCH = 50
+
+
+def bench_try_extract_json(size: int, rng: random.Random):
+    main = load("1-strctured-output", "main")
+    texts = [f"{words(rng, size)}\n```json\n{json.dumps(movie(rng, size))}\n```\n{words(rng, size)}"
+             for _ in range(BATCH)]
+    return lambda: [main.try_extract_json(t) for t in texts], len(texts)
+
+
+def bench_valid_movie(size: int, rng: random.Random):
+    main = load("1-strctured-output", "main")
+    movies = [movie(rng) for _ in range(size)]
+    return lambda: [main.valid_movie(m) for m in movies], len(movies)
+
+
+def bench_score_sample(size: int, rng: random.Random):
+    ev = load("2-structured-output-libs", "eval")
+    pairs = []
+    for _ in range(BATCH):
+        gold = task_dict(rng, size)
+        pred = {**task_dict(rng, size), "tags": gold["tags"][: size // 2] + task_dict(rng, size)["tags"][size // 2:]}
+        pairs.append((pred, gold))
+    return lambda: [ev.score_sample(p, g) for p, g in pairs], len(pairs)
+
+
+def bench_aggregate(size: int, rng: random.Random):
+    ev = load("2-structured-output-libs", "eval")
+    keys = ["priority", "owner", "tags", "deadline", "overall"]
+    scores = [{k: rng.random() < 0.7 for k in keys} for _ in range(size)]
+    return lambda: ev.aggregate(scores), len(scores)
+
+
+def bench_task_validate(size: int, rng: random.Random):
+    schema = load("2-structured-output-libs", "schema")
+    dicts = [task_dict(rng, size) for _ in range(BATCH)]
+    return lambda: [schema.Task.model_validate(d) for d in dicts], len(dicts)
+
+
+def bench_normalize_tags(size: int, rng: random.Random):
+    schema = load("2-structured-output-libs", "schema")
+    tag_lists = [task_dict(rng, size)["tags"] + [None, 3] for _ in range(BATCH)]
+    return lambda: [schema.Task._normalize_tags(tags) for tags in tag_lists], len(tag_lists)
+
+
+def bench_calculator(size: int, rng: random.Random):
+    tools = load("4-agents", "main").Tools
+    compile_cache = tools.calculator.__globals__["evaluate"].__globals__["compile_expression"]
+    exprs = [expression(rng, size) for _ in range(BATCH)]
+
+    def run():
+        compile_cache.cache_clear()
+        return [tools.calculator(e) for e in exprs]
+    return run, len(exprs)
+
+
+def bench_short_term_memory(size: int, rng: random.Random):
+    memory = load("3-memory-and-context-window", "memory")
+    turns = [(rng.choice(["user", "assistant"]), words(rng, 12)) for _ in range(size)]
+
+    def run():
+        stm = memory.ShortTermMemory()
+        for role, content in turns:
+            stm.append(role, content)
+            stm.last_window()
+    return run, len(turns)
+
+
+def bench_memory_search(size: int, rng: random.Random):
+    memory = load("3-memory-and-context-window", "memory")
+    store = memory.MemoryStore()
+    store._embedder = StubEmbedder(store._emb_dim)
+    texts = [words(rng, 10) for _ in range(size)]
+    store._index.add(store.embedder.encode(texts))
+    store._texts, store._live = texts, [True] * len(texts)
+    queries = [words(rng, 5) for _ in range(20)]
+    return lambda: [store.search(q) for q in queries], len(queries)
+
+
+class Bench(NamedTuple):
+    name: str
+    setup: Callable[[int, random.Random], Tuple[Callable[[], Any], int]]
+    sizes: Sequence[int]
+
+
+BENCHMARKS = [
+    Bench("try_extract_json", bench_try_extract_json, (4, 32, 256)),
+    Bench("valid_movie", bench_valid_movie, (10, 100, 1000)),
+    Bench("eval.score_sample", bench_score_sample, (4, 32, 256)),
+    Bench("eval.aggregate", bench_aggregate, (10, 100, 1000)),
+    Bench("Task.model_validate", bench_task_validate, (4, 32, 256)),
+    Bench("Task._normalize_tags", bench_normalize_tags, (4, 32, 256)),
+    Bench("Tools.calculator", bench_calculator, (2, 8, 32)),
+    Bench("ShortTermMemory", bench_short_term_memory, (10, 100, 1000)),
+    Bench("MemoryStore.search", bench_memory_search, (100, 1000, 10000)),
+]
+
+
+# -- measurement -----------------------------------------------------------
+
+_CALIBRATION_DATA = [{"id": i, "name": f"item-{i}", "tags": [str(i % 7), str(i % 11)]} for i in range(300)]
+
+
+def calibration() -> None:
+    """Fixed pure-Python work (~1 ms) timed next to every sample"""
+    items = json.loads(json.dumps(_CALIBRATION_DATA))
+    items.sort(key=lambda d: (d["tags"][1], -d["id"]))
+    sum(len(re.findall(r"\d", d["name"])) for d in items)
+
+
+def timed(fn: Callable[[], Any], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - started
+
+
+def measure(fn: Callable[[], Any], items: int, samples: int) -> Dict[str, Any]:
+    """Per-item microseconds and per-item time / calibration time for each sample"""
+    fn()  # warm-up
+    number = max(1, math.ceil(TARGET_SAMPLE_S / max(timed(fn, 1), 1e-9)))
+    cal_number = max(1, math.ceil(TARGET_SAMPLE_S / max(timed(calibration, 1), 1e-9)))
+    us, normalised = [], []
+    for _ in range(samples):
+        # min of alternating short runs, so a burst of background load hits neither side alone
+        cal = min(timed(calibration, cal_number) for _ in range(3)) / cal_number
+        t = min(timed(fn, number) for _ in range(3)) / number / items
+        cal = min(cal, min(timed(calibration, cal_number) for _ in range(3)) / cal_number)
+        us.append(round(t * 1e6, 4))
+        normalised.append(round(t / cal, 6))
+    return {"us": us, "normalised": normalised}
+
+
+def mann_whitney_greater(x: Sequence[float], y: Sequence[float]) -> float:
+    """One-sided p-value that `x` tends to be larger than `y` (normal approximation, tie-corrected)"""
+    n1, n2 = len(x), len(y)
+    ranked = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    u = sum(r for r, (_, group) in zip(ranks, ranked) if group == 0) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(current: Dict[str, Any], baseline: Optional[Dict[str, Any]], alpha: float,
+            min_effect: float) -> Tuple[str, Optional[float], Optional[float]]:
+    """(status, relative change of the normalised median, p-value of the change's direction)"""
+    if not baseline:
+        return "new", None, None
+    cur, base = current["normalised"], baseline["normalised"]
+    change = statistics.median(cur) / statistics.median(base) - 1
+    if change > 0:
+        p = mann_whitney_greater(cur, base)
+        status = "regressed" if p < alpha and change > min_effect else "ok"
+    else:
+        p = mann_whitney_greater(base, cur)
+        status = "improved" if p < alpha and -change > min_effect else "ok"
+    return status, change, p
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the examples' hot paths")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--only", default=None, help="substring filter on benchmark names")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level of the Mann-Whitney test")
+    parser.add_argument("--min-effect", type=float, default=0.2, help="ignore median changes smaller than this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, regressed, failed = {}, [], []
+    print(f"{'benchmark':<34} {'us/item':>10} {'base us':>10} {'change':>8} {'p':>8}  status")
+    for bench in BENCHMARKS:
+        if args.only and args.only not in bench.name:
+            continue
+        for size in bench.sizes:
+            key = f"{bench.name}[{size}]"
+            try:
+                fn, items = bench.setup(size, random.Random(args.seed))
+            except ImportError as e:
+                baselined = [k for k in baseline.get("benchmarks", {}) if k.startswith(f"{bench.name}[")]
+                status = "failed" if baselined else "skipped"
+                print(f"{key:<34} {'-':>10} {'-':>10} {'-':>8} {'-':>8}  {status} ({e})")
+                if baselined:
+                    failed.append(bench.name)
+                break
+            current = measure(fn, items, args.samples)
+            results[key] = current
+            base = baseline.get("benchmarks", {}).get(key)
+            status, change, p = compare(current, base, args.alpha, args.min_effect)
+            if status == "regressed":
+                regressed.append(key)
+            base_us = f"{statistics.median(base['us']):.2f}" if base else "-"
+            change_s = "-" if change is None else f"{change:+.1%}"
+            p_s = "-" if p is None else f"{p:.4f}"
+            print(f"{key:<34} {statistics.median(current['us']):>10.2f} {base_us:>10} {change_s:>8} {p_s:>8}  {status}")
+
+    if failed:
+        print(f"\n{len(failed)} baselined benchmark(s) could not run: {', '.join(failed)}")
+    if args.update:
+        if failed:
+            print("Baseline not written; run in a venv with every benchmark's dependencies")
+            sys.exit(1)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "benchmarks": {**baseline.get("benchmarks", {}), **results}}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {args.baseline}")
+        return
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed: {', '.join(regressed)}")
+    if regressed or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Load generator for any OpenAI-compatible endpoint (by default the local mock).
+
+Closed loop (N concurrent clients, each sending back-to-back requests):
+
+    python loadgen.py --concurrency 32 --requests 2000
+
+Open loop (fixed arrival rate, regardless of how fast responses come back):
+
+    python loadgen.py --rate 200 --duration 30 --stream --tools
+
+Reports client-side throughput, latency percentiles, time to first token
+(streaming) and errors by type. The SDK's own retries are disabled so that
+429s and 5xx responses show up in the numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+CALCULATOR_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "calculator",
+        "description": "Perform mathematical calculations",
+        "parameters": {
+            "type": "object",
+            "properties": {"expression": {"type": "string"}},
+            "required": ["expression"],
+        },
+    },
+}
+
+
+class Sample:
+    __slots__ = ("latency", "ttft", "completion_tokens", "error")
+
+    def __init__(self, latency: float, ttft: Optional[float], completion_tokens: int, error: Optional[str]):
+        self.latency = latency
+        self.ttft = ttft
+        self.completion_tokens = completion_tokens
+        self.error = error
+
+
+async def one_request(client: AsyncOpenAI, args: argparse.Namespace, i: int) -> Sample:
+    kwargs: Dict[str, Any] = {
+        "model": args.model,
+        "messages": [{"role": "user", "content": f"{args.prompt} (request {i})"}],
+        "max_tokens": args.max_tokens,
+    }
+    if args.tools:
+        kwargs["tools"] = [CALCULATOR_TOOL]
+    started = time.perf_counter()
+    ttft, tokens = None, 0
+    try:
+        if args.stream:
+            stream = await client.chat.completions.create(
+                **kwargs, stream=True, stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    tokens = chunk.usage.completion_tokens
+                if ttft is None and chunk.choices:
+                    delta = chunk.choices[0].delta
+                    if delta.content or delta.tool_calls:
+                        ttft = time.perf_counter() - started
+        else:
+            response = await client.chat.completions.create(**kwargs)
+            tokens = response.usage.completion_tokens if response.usage else 0
+    except Exception as e:
+        status = getattr(e, "status_code", None)
+        return Sample(time.perf_counter() - started, None, 0, f"{status or type(e).__name__}")
+    return Sample(time.perf_counter() - started, ttft, tokens, None)
+
+
+async def closed_loop(client: AsyncOpenAI, args: argparse.Namespace) -> List[Sample]:
+    samples: List[Sample] = []
+    counter = iter(range(args.requests))
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def worker() -> None:
+        for i in counter:
+            if deadline and time.perf_counter() > deadline:
+                return
+            samples.append(await one_request(client, args, i))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return samples
+
+
+async def open_loop(client: AsyncOpenAI, args: argparse.Namespace) -> List[Sample]:
+    tasks = []
+    total = int(args.rate * args.duration) if args.duration else args.requests
+    start = time.perf_counter()
+    for i in range(total):
+        delay = start + i / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one_request(client, args, i)))
+    return await asyncio.gather(*tasks)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98]}
+
+
+def report(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    ok = [s for s in samples if s.error is None]
+    result = {
+        "requests": len(samples),
+        "ok": len(ok),
+        "errors": dict(Counter(s.error for s in samples if s.error)),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "tokens_per_s": round(sum(s.completion_tokens for s in ok) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {k: round(v * 1000, 1) for k, v in percentiles([s.latency for s in ok]).items()},
+    }
+    ttfts = [s.ttft for s in ok if s.ttft is not None]
+    if ttfts:
+        result["ttft_ms"] = {k: round(v * 1000, 1) for k, v in percentiles(ttfts).items()}
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for OpenAI-compatible endpoints")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:8000/v1"))
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--prompt", default="Summarize the benefits of structured output in one sentence.")
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop clients")
+    parser.add_argument("--rate", type=float, default=None, help="open-loop requests/sec (overrides --concurrency)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=None, help="seconds (overrides --requests)")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--tools", action="store_true", help="offer a calculator tool")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if args.duration and not args.rate:
+        args.requests = 10 ** 9  # run until the deadline
+
+    client = AsyncOpenAI(base_url=args.base_url, api_key=os.getenv("OPENAI_API_KEY", "mock"), max_retries=0)
+    started = time.perf_counter()
+    samples = await (open_loop(client, args) if args.rate else closed_loop(client, args))
+    result = report(samples, time.perf_counter() - started)
+    await client.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    mode = f"open loop @ {args.rate} rps" if args.rate else f"closed loop x{args.concurrency}"
+    print(f"{args.base_url}  {mode}  stream={args.stream} tools={args.tools}")
+    print(f"  requests     {result['requests']} ({result['ok']} ok)  errors {result['errors'] or '-'}")
+    print(f"  throughput   {result['throughput_rps']} req/s, {result['tokens_per_s']} completion tokens/s")
+    print("  latency ms   " + "  ".join(f"{k} {v}" for k, v in result["latency_ms"].items()))
+    if "ttft_ms" in result:
+        print("  ttft ms      " + "  ".join(f"{k} {v}" for k, v in result["ttft_ms"].items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
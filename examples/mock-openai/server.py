@@ -0,0 +1,379 @@
+"""
+Local OpenAI-compatible mock server for offline performance testing.
+
+Implements enough of the Chat Completions API for every example in this repo:
+plain completions, legacy `functions`/`function_call`, `tools`/`tool_calls`,
+`response_format` (json_object / json_schema), streaming (SSE, including
+`stream_options.include_usage`) and `usage` fields. Standard library only.
+
+    python server.py --port 8000 --latency lognormal:-1.6,0.5 --tpot 0.01 \
+        --error-rate 0.01 --rate-limit-rate 0.02 --rpm 600 --script script.json
+
+    export OPENAI_BASE_URL=http://localhost:8000/v1   # every example picks this up
+
+Latency specs (seconds, time to first token): fixed:S, uniform:LO,HI,
+lognormal:MU,SIGMA. --tpot adds a per-output-token delay.
+
+A script is a JSON list of rules; the first rule whose `match` regex matches
+the last user message wins (use "" to match everything). Rules that answer
+with tool_calls or a function_call only apply while the conversation ends in
+a user message, so a tool result gets a final answer instead of the same call
+again:
+
+    [{"match": "weather", "content": "Sunny, 22C"},
+     {"match": "calculate", "tool_calls": [{"name": "calculator", "arguments": {"expression": "2+2"}}]},
+     {"match": "flaky", "status": 500}]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Response generation
+# ---------------------------------------------------------------------------
+
+PATTERN_CANDIDATES = ["US", "2000-01-01", "A", "a", "0", "x"]
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def example_from_schema(schema: Dict[str, Any], hint: str = "", defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Build a (best-effort) valid instance of a JSON schema"""
+    defs = defs if defs is not None else schema.get("$defs", schema.get("definitions", {}))
+    if "$ref" in schema:
+        return example_from_schema(defs.get(schema["$ref"].split("/")[-1], {}), hint, defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return example_from_schema(options[0], hint, defs)
+
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: example_from_schema(sub, name, defs)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 1), 1)
+        return [example_from_schema(schema.get("items", {}), hint, defs) for _ in range(count)]
+    if kind == "integer":
+        low = schema.get("minimum", schema.get("exclusiveMinimum", -1) + 1)
+        return max(low, min(schema.get("maximum", 2000), 2000))
+    if kind == "number":
+        low, high = schema.get("minimum", 0.0), schema.get("maximum", 1.0)
+        return (low + high) / 2
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    # string
+    if schema.get("format") == "date":
+        return "2000-01-01"
+    if "pattern" in schema:
+        for candidate in PATTERN_CANDIDATES:
+            if re.fullmatch(schema["pattern"], candidate):
+                return candidate
+    value = hint or "mock"
+    return value.ljust(schema.get("minLength", 0), "x")
+
+
+def _last(messages: List[Dict[str, Any]], role: Optional[str] = None) -> str:
+    for message in reversed(messages):
+        if role is None or message.get("role") == role:
+            content = message.get("content") or ""
+            return content if isinstance(content, str) else json.dumps(content)
+    return ""
+
+
+def plan_response(body: Dict[str, Any], script: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Decide what the mock model 'says': content, tool_calls, function_call or an error status"""
+    messages = body.get("messages", [])
+    user = _last(messages, "user") or _last(messages)  # e.g. BAML sends its prompt as a system message
+    user_turn = bool(messages) and messages[-1].get("role") == "user"
+
+    for rule in script:
+        if not user_turn and ("tool_calls" in rule or "function_call" in rule):
+            continue  # answer the tool result rather than repeating the call
+        if re.search(rule.get("match", ""), user, re.IGNORECASE):
+            if "status" in rule:
+                return {"status": rule["status"]}
+            if "tool_calls" in rule:
+                return {"tool_calls": [
+                    {"name": c["name"], "arguments": json.dumps(c.get("arguments", {}))} for c in rule["tool_calls"]
+                ]}
+            if "function_call" in rule:
+                call = rule["function_call"]
+                return {"function_call": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}}
+            return {"content": rule.get("content", "")}
+
+    if body.get("functions"):
+        fn = body["functions"][0]
+        forced = body.get("function_call")
+        if isinstance(forced, dict):
+            fn = next((f for f in body["functions"] if f["name"] == forced.get("name")), fn)
+        return {"function_call": {"name": fn["name"], "arguments": json.dumps(example_from_schema(fn.get("parameters", {}), user[:40]))}}
+
+    tools = body.get("tools") or []
+    if tools and messages and messages[-1].get("role") == "user" and body.get("tool_choice") != "none":
+        choice = body.get("tool_choice")
+        fn = tools[0]["function"]
+        if isinstance(choice, dict):
+            fn = next((t["function"] for t in tools if t["function"]["name"] == choice["function"]["name"]), fn)
+        return {"tool_calls": [{"name": fn["name"], "arguments": json.dumps(example_from_schema(fn.get("parameters", {}), user[:40]))}]}
+    if messages and messages[-1].get("role") == "tool":
+        results = sum(1 for m in messages if m.get("role") == "tool")
+        return {"content": f"Mock final answer based on {results} tool result(s)."}
+
+    fmt = body.get("response_format") or {}
+    if fmt.get("type") == "json_schema":
+        return {"content": json.dumps(example_from_schema(fmt["json_schema"].get("schema", {}), user[:40]))}
+    if fmt.get("type") == "json_object":
+        return {"content": json.dumps({"answer": user[:40]})}
+
+    words = user.split()[:24]
+    return {"content": "Mock response: " + " ".join(words)}
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class LatencyModel:
+    def __init__(self, spec: str, tpot: float):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",")] if args else []
+        self.tpot = tpot
+
+    def first_token(self) -> float:
+        if self.kind == "fixed":
+            return self.args[0] if self.args else 0.0
+        if self.kind == "uniform":
+            return random.uniform(*self.args)
+        if self.kind == "lognormal":
+            return random.lognormvariate(*self.args)
+        raise ValueError(f"unknown latency distribution '{self.kind}'")
+
+
+class TokenBucket:
+    def __init__(self, rpm: Optional[float]):
+        self.rate = rpm / 60 if rpm else None
+        self.tokens = self.capacity = max(1.0, (rpm or 0) / 60)
+        self.updated = time.monotonic()
+
+    def take(self) -> Optional[float]:
+        """None if allowed, otherwise seconds until a request would be"""
+        if self.rate is None:
+            return None
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rate
+
+
+class MockServer:
+    def __init__(self, args: argparse.Namespace):
+        self.latency = LatencyModel(args.latency, args.tpot)
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.bucket = TokenBucket(args.rpm)
+        self.script: List[Dict[str, Any]] = []
+        if args.script:
+            with open(args.script) as f:
+                self.script = json.load(f)
+        self.stats = {"requests": 0, "streamed": 0, "429": 0, "500": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    # -- HTTP plumbing ------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.route(writer, method, path, body)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        return method, path, headers, body
+
+    async def _send(self, writer, status: int, payload: Any, extra: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+        head = [f"HTTP/1.1 {status} {reason.get(status, 'OK')}", "Content-Type: application/json",
+                f"Content-Length: {len(data)}"] + [f"{k}: {v}" for k, v in (extra or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+        await writer.drain()
+
+    async def _error(self, writer, status: int, message: str, kind: str, extra=None) -> None:
+        await self._send(writer, status, {"error": {"message": message, "type": kind, "code": kind}}, extra)
+
+    # -- API ----------------------------------------------------------------
+
+    async def route(self, writer, method: str, path: str, raw: bytes) -> None:
+        path = path.split("?")[0].rstrip("/")
+        if method == "GET" and path.endswith("/models"):
+            return await self._send(writer, 200, {"object": "list", "data": [
+                {"id": "gpt-4o-mini", "object": "model", "owned_by": "mock"},
+                {"id": "gpt-4o", "object": "model", "owned_by": "mock"},
+            ]})
+        if method == "GET" and path.endswith("/stats"):
+            return await self._send(writer, 200, self.stats)
+        if method == "POST" and path.endswith("/chat/completions"):
+            try:
+                body = json.loads(raw or b"{}")
+            except json.JSONDecodeError as e:
+                return await self._error(writer, 400, f"invalid JSON body: {e}", "invalid_request_error")
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+            try:
+                return await self.chat_completions(writer, body)
+            finally:
+                self.stats["in_flight"] -= 1
+        return await self._error(writer, 404, f"no route for {method} {path}", "not_found")
+
+    async def chat_completions(self, writer, body: Dict[str, Any]) -> None:
+        wait = self.bucket.take()
+        if wait is not None or random.random() < self.rate_limit_rate:
+            self.stats["429"] += 1
+            return await self._error(writer, 429, "Rate limit reached (mock)", "rate_limit_exceeded",
+                                     {"Retry-After": f"{wait or 1:.2f}"})
+        if random.random() < self.error_rate:
+            self.stats["500"] += 1
+            return await self._error(writer, 500, "Internal error (mock)", "server_error")
+
+        plan = plan_response(body, self.script)
+        if "status" in plan:
+            self.stats[str(plan["status"])] = self.stats.get(str(plan["status"]), 0) + 1
+            return await self._error(writer, plan["status"], "Scripted error (mock)", "scripted_error")
+
+        model = body.get("model", "gpt-4o-mini")
+        prompt_tokens = sum(count_tokens(json.dumps(m.get("content") or "")) + 4 for m in body.get("messages", []))
+        text = plan.get("content") or ""
+        args_text = "".join(c["arguments"] for c in plan.get("tool_calls", [])) + (plan.get("function_call") or {}).get("arguments", "")
+        completion_tokens = count_tokens(text) + count_tokens(args_text)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        created, cid = int(time.time()), f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        tool_calls = [
+            {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function", "function": call}
+            for call in plan.get("tool_calls", [])
+        ]
+        finish = "tool_calls" if tool_calls else "function_call" if "function_call" in plan else "stop"
+
+        await asyncio.sleep(self.latency.first_token())
+
+        if not body.get("stream"):
+            await asyncio.sleep(self.latency.tpot * completion_tokens)
+            message = {"role": "assistant", "content": text or None}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            if "function_call" in plan:
+                message["function_call"] = plan["function_call"]
+            return await self._send(writer, 200, {
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish, "logprobs": None}],
+                "usage": usage,
+            })
+
+        self.stats["streamed"] += 1
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+
+        async def event(delta: Dict[str, Any], finish_reason: Optional[str] = None, extra: Optional[Dict] = None):
+            chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}]}
+            if extra:
+                chunk.update(extra)
+            await self._chunk(writer, f"data: {json.dumps(chunk)}\n\n")
+
+        await event({"role": "assistant", "content": ""})
+        for piece in re.findall(r"\S+\s*", text):
+            await event({"content": piece})
+            await asyncio.sleep(self.latency.tpot * count_tokens(piece))
+        for index, call in enumerate(tool_calls):
+            await event({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                         "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            arguments = call["function"]["arguments"]
+            for start in range(0, len(arguments), 16):
+                await event({"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + 16]}}]})
+                await asyncio.sleep(self.latency.tpot * 4)
+        if "function_call" in plan:
+            await event({"function_call": plan["function_call"]})
+        await event({}, finish)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await self._chunk(writer, "data: " + json.dumps({
+                "id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [], "usage": usage}) + "\n\n")
+        await self._chunk(writer, "data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _chunk(self, writer, text: str) -> None:
+        data = text.encode()
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0.05", help="time-to-first-token distribution")
+    parser.add_argument("--tpot", type=float, default=0.0, help="seconds per output token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests failing with 429")
+    parser.add_argument("--rpm", type=float, default=None, help="token-bucket request limit per minute (429 beyond)")
+    parser.add_argument("--script", default=None, help="JSON file of scripted responses")
+    args = parser.parse_args()
+
+    mock = MockServer(args)
+    server = await asyncio.start_server(mock.handle, args.host, args.port, backlog=1024)
+    print(f"mock OpenAI listening on http://{args.host}:{args.port}/v1 (latency={args.latency}, tpot={args.tpot})")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,65 @@
+"""
+Script-driven round trips against the mock server, over HTTP.
+
+    python -m unittest test_server
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import unittest
+import urllib.request
+
+from server import MockServer
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script.example.json")
+CALCULATOR = {"type": "function", "function": {
+    "name": "calculator",
+    "parameters": {"type": "object", "properties": {"expression": {"type": "string"}}, "required": ["expression"]},
+}}
+
+
+class ScriptedToolRoundTripTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        args = argparse.Namespace(latency="fixed:0", tpot=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                                  rpm=None, script=SCRIPT)
+        cls.loop = asyncio.new_event_loop()
+        cls.server = cls.loop.run_until_complete(asyncio.start_server(MockServer(args).handle, "127.0.0.1", 0))
+        cls.url = "http://127.0.0.1:%d/v1/chat/completions" % cls.server.sockets[0].getsockname()[1]
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(timeout=5)
+
+    def chat(self, messages):
+        body = json.dumps({"model": "mock", "messages": messages, "tools": [CALCULATOR]}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.load(response)["choices"][0]
+
+    def test_tool_call_then_final_answer(self):
+        messages = [{"role": "user", "content": "What is 15 * 23 + 47?"}]
+        first = self.chat(messages)
+        self.assertEqual(first["finish_reason"], "tool_calls")
+        call = first["message"]["tool_calls"][0]
+        self.assertEqual(call["function"]["name"], "calculator")
+        self.assertEqual(json.loads(call["function"]["arguments"]), {"expression": "15 * 23 + 47"})
+
+        messages += [
+            {"role": "assistant", "content": None, "tool_calls": [call]},
+            {"role": "tool", "tool_call_id": call["id"], "content": "Calculation result: 392"},
+        ]
+        second = self.chat(messages)
+        self.assertEqual(second["finish_reason"], "stop")
+        self.assertFalse(second["message"].get("tool_calls"))
+        self.assertTrue(second["message"]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Shared, pooled OpenAI clients.
+
+    client = get_async_client()        # AsyncOpenAI for $OPENAI_BASE_URL, created on first use
+    client = get_client(base_url)      # sync OpenAI for another endpoint
+
+Modules ask this factory instead of building their own client. Every caller
+then shares one connection pool per base URL and API key, so keep-alive
+connections and TLS sessions are reused instead of being set up again by each
+client. Async clients are also keyed by event loop, because pooled connections
+cannot move between loops. Pool limits come from the environment:
+
+    OPENAI_MAX_CONNECTIONS   (default 100)
+    OPENAI_MAX_KEEPALIVE     (default 20)
+    OPENAI_KEEPALIVE_EXPIRY  seconds (default 30)
+    OPENAI_HTTP2=1           HTTP/2 multiplexing, needs the optional `h2` package
+
+pool_stats() reports requests, connections opened, reuse rate and the current
+open/idle connections per base URL, summed over every client for that URL.
+
+This file lives in examples/shared/; each project's openai_client.py is a
+symlink to it, so the projects stay standalone but share one implementation.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str, Any], Any] = {}   # (base_url, key hash, event loop or "sync") -> client
+_stats: Dict[Tuple[str, Any], "PoolStats"] = {}
+
+
+class PoolStats:
+    """Counts requests and distinct connections seen by the clients for one base URL"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self._streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self.http_clients: Dict[Tuple[str, str, Any], Any] = {}  # cached client key -> its httpx client
+
+    def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    def on_response(self, response: httpx.Response) -> None:
+        stream = response.extensions.get("network_stream")
+        try:
+            if stream is not None and stream not in self._streams:
+                self._streams.add(stream)
+                self.connections_opened += 1
+        except TypeError:  # stream type not weak-referenceable
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        # httpcore's pool is private API; treat the connection counts as best effort
+        connections = []
+        for http_client in list(self.http_clients.values()):
+            pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+            connections.extend(getattr(pool, "connections", []))
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reuse_rate": round(1 - self.connections_opened / self.requests, 3) if self.requests else 0.0,
+            "open": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30")),
+    )
+
+
+def _http2() -> bool:
+    if os.getenv("OPENAI_HTTP2", "").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import h2  # noqa: F401  optional dependency
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve(base_url: Optional[str]) -> str:
+    return (base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+
+def _key_hash(api_key: Optional[str]) -> str:
+    """Cache-key part for the API key the client would use; the key itself is not kept"""
+    key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def get_async_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> AsyncOpenAI:
+    """The shared AsyncOpenAI client for `base_url` (default $OPENAI_BASE_URL) on the current event loop"""
+    url = _resolve(base_url)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _lock:
+        for key in [k for k in _clients if k[2] not in (None, "sync") and k[2].is_closed()]:
+            _clients.pop(key)
+            _stats[(key[0], "async")].http_clients.pop(key, None)
+        key = (url, _key_hash(api_key), loop)
+        if key not in _clients:
+            # One PoolStats per base URL, accumulated across event loops and keys
+            stats = _stats.setdefault((url, "async"), PoolStats())
+
+            async def on_request(request: httpx.Request) -> None:
+                stats.on_request(request)
+
+            async def on_response(response: httpx.Response) -> None:
+                stats.on_response(response)
+
+            http_client = DefaultAsyncHttpxClient(
+                limits=_limits(), http2=_http2(), event_hooks={"request": [on_request], "response": [on_response]}
+            )
+            stats.http_clients[key] = http_client
+            _clients[key] = AsyncOpenAI(base_url=url, api_key=api_key, http_client=http_client)
+        return _clients[key]
+
+
+def get_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> OpenAI:
+    """The shared sync OpenAI client for `base_url` (default $OPENAI_BASE_URL)"""
+    url = _resolve(base_url)
+    with _lock:
+        key = (url, _key_hash(api_key), "sync")
+        if key not in _clients:
+            stats = _stats.setdefault((url, "sync"), PoolStats())
+            http_client = DefaultHttpxClient(
+                limits=_limits(), http2=_http2(),
+                event_hooks={"request": [stats.on_request], "response": [stats.on_response]},
+            )
+            stats.http_clients[key] = http_client
+            _clients[key] = OpenAI(base_url=url, api_key=api_key, http_client=http_client)
+        return _clients[key]
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection-pool metrics per base URL, keyed by "<kind> <base_url>" """
+    with _lock:
+        return {f"{kind} {url}": stats.snapshot() for (url, kind), stats in _stats.items()}